@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Checkout throughput benchmark for the Hotel Management backend.
+
+Simulates the end-of-morning rush on a local mongod: seeds a scratch database
+with checked-in customers in occupied rooms, then checks them all out with a
+fixed number of concurrent front-desk clients and reports checkouts/second.
+
+Usage: python benchmarks/checkout_throughput.py [--guests 2000] [--concurrency 20]
+Environment: MONGO_URL (default mongodb://localhost:27017),
+             BENCH_DB_NAME (default hotel_benchmark, dropped afterwards)
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ['DB_NAME'] = os.environ.get('BENCH_DB_NAME', 'hotel_benchmark')
+
+import server  # noqa: E402
+
+
+async def seed(guests):
+    """Create one occupied room, checked-in booking and customer per guest."""
+    db = server.db
+    await db.client.drop_database(db.name)
+    await server.ensure_indexes()
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    rooms, bookings, customers = [], [], []
+    for n in range(guests):
+        room_number = str(1000 + n)
+        stay = {"check_in_date": today - timedelta(days=2), "check_out_date": today}
+        rooms.append({"id": f"room-{n}", "room_number": room_number, "room_type": "Double", "status": "Occupied", "current_guest": f"Guest {n}", **stay})
+        bookings.append({"id": f"booking-{n}", "guest_name": f"Guest {n}", "room_number": room_number, "status": "Checked-in", "created_at": today, **stay})
+        customers.append(server.Customer(
+            name=f"Guest {n}", email=f"guest{n}@example.com", phone="000", current_room=room_number,
+            booking_id=f"booking-{n}", check_in_date=stay["check_in_date"].date(), check_out_date=today.date(),
+            advance_amount=100.0, room_charges=900.0, total_amount=800.0
+        ).dict())
+        customers[-1].update(stay)
+    await db.rooms.insert_many(rooms)
+    await db.bookings.insert_many(bookings)
+    await db.customers.insert_many(customers)
+    await server.load_room_intervals()
+    return [customer["id"] for customer in customers]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--guests', type=int, default=2000, help='checked-in guests to check out')
+    parser.add_argument('--concurrency', type=int, default=20, help='simultaneous front-desk clients')
+    args = parser.parse_args()
+    server.connect()
+
+    print(f"Seeding {args.guests} checked-in guests into {server.db.name}...")
+    customer_ids = await seed(args.guests)
+    print("=" * 80)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def checkout(customer_id):
+        async with semaphore:
+            started = time.perf_counter()
+            await server.checkout_customer(server.CheckoutRequest(customer_id=customer_id, additional_amount=50.0, payment_method="Card"))
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(checkout(customer_id) for customer_id in customer_ids))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        print(f"Checkouts:        {len(latencies)} with {args.concurrency} concurrent clients")
+        print(f"Throughput:       {len(latencies) / elapsed:.1f} checkouts/s")
+        print(f"Latency p50:      {statistics.median(latencies):.2f}ms")
+        print(f"Latency p95:      {latencies[int(len(latencies) * 0.95) - 1]:.2f}ms")
+        print(f"Daily sales rows: {await server.db.daily_sales.count_documents({})}")
+    finally:
+        await server.db.client.drop_database(server.db.name)
+        server.client.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
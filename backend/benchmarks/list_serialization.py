@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+List serialization benchmark for the Hotel Management backend.
+
+Seeds a scratch database with rooms, bookings and customers, fetches each list
+once the way its handler does, then times turning those documents into response
+bytes on both paths and reports the cost per 1000 documents:
+
+  validated  Model(**doc), response_model validation, stdlib json
+  fast       FAST_LIST_RESPONSES: projected fields, one date pass, orjson
+
+Usage: python benchmarks/list_serialization.py [--docs 5000] [--repeat 20]
+Environment: MONGO_URL (default mongodb://localhost:27017),
+             BENCH_DB_NAME (default hotel_benchmark, dropped afterwards)
+"""
+
+import argparse
+import asyncio
+import copy
+import os
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ['DB_NAME'] = os.environ.get('BENCH_DB_NAME', 'hotel_benchmark')
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+
+import server  # noqa: E402
+
+LISTS = [
+    ("/api/rooms", "rooms", server.Room),
+    ("/api/bookings", "bookings", server.Booking),
+    ("/api/customers/checked-in", "customers", server.Customer),
+]
+
+
+async def seed(count):
+    db = server.db
+    await db.client.drop_database(db.name)
+    await server.ensure_indexes()
+    start = date(2025, 1, 1)
+    rooms, bookings, customers = [], [], []
+    for n in range(count):
+        stay_start = start + timedelta(days=n % 300)
+        stay_end = stay_start + timedelta(days=3)
+        rooms.append(server.Room(
+            room_number=str(1000 + n), room_type="Double", status="Occupied", current_guest=f"Guest {n}",
+            check_in_date=stay_start, check_out_date=stay_end, price_per_night=7500.0,
+            amenities=["WiFi", "TV", "AC", "Mini Fridge"]
+        ).dict())
+        bookings.append(server.Booking(
+            guest_name=f"Guest {n}", guest_email=f"guest{n}@example.com", guest_phone="555-0100",
+            room_number=str(1000 + n), check_in_date=stay_start, check_out_date=stay_end,
+            booking_amount=22500.0, status="Checked-in"
+        ).dict())
+        customers.append(server.Customer(
+            name=f"Guest {n}", email=f"guest{n}@example.com", phone="555-0100", current_room=str(1000 + n),
+            check_in_date=stay_start, check_out_date=stay_end, advance_amount=5000.0,
+            room_charges=22500.0, total_amount=17500.0
+        ).dict())
+    await db.rooms.insert_many(rooms)
+    await db.bookings.insert_many(bookings)
+    await db.customers.insert_many(customers)
+
+
+async def validated(docs, model, field):
+    content = await serialize_response(field=field, response_content=[model(**doc) for doc in docs])
+    return JSONResponse(content).body
+
+
+async def fast(docs, model, field):
+    return server.list_shape(model).render(docs, {}).body
+
+
+async def measure(render, docs, model, field, repeat):
+    """Best-of-``repeat`` milliseconds per 1000 documents and the body size."""
+    best = float("inf")
+    for _ in range(repeat):
+        batch = copy.deepcopy(docs)
+        started = time.perf_counter()
+        body = await render(batch, model, field)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000 * 1000 / len(docs), len(body)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--docs', type=int, default=5000, help='documents per list')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per path (best is reported)')
+    args = parser.parse_args()
+    server.connect()
+
+    print(f"Seeding {args.docs} rooms, bookings and customers into {server.db.name}...")
+    await seed(args.docs)
+    routes = {route.path: route for route in server.app.routes if "GET" in getattr(route, "methods", ())}
+    print("=" * 80)
+    print(f"{'List':<28}{'validated ms/1k':>16}{'fast ms/1k':>12}{'speedup':>9}{'same size':>11}")
+
+    try:
+        for path, collection, model in LISTS:
+            field = routes[path].response_field
+            sort = [("created_at", 1), ("id", 1)]
+            docs = await server.db[collection].find().sort(sort).to_list(None)
+            projected = await server.db[collection].find({}, server.list_shape(model).projection).sort(sort).to_list(None)
+
+            before, before_bytes = await measure(validated, docs, model, field, args.repeat)
+            after, after_bytes = await measure(fast, projected, model, field, args.repeat)
+            print(f"{path:<28}{before:>16.2f}{after:>12.2f}{before / after:>8.1f}x{str(before_bytes == after_bytes):>11}")
+    finally:
+        await server.db.client.drop_database(server.db.name)
+        server.client.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Report fan-out benchmark for the Hotel Management backend.
+
+Seeds a scratch database on a local mongod and times the report handlers with
+their independent queries run one at a time (concurrency 1) versus fanned out
+with asyncio.gather (REPORT_QUERY_CONCURRENCY).
+
+Usage: python benchmarks/report_fanout.py [--days 730] [--runs 50]
+Environment: MONGO_URL (default mongodb://localhost:27017),
+             BENCH_DB_NAME (default hotel_benchmark, dropped afterwards)
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ['DB_NAME'] = os.environ.get('BENCH_DB_NAME', 'hotel_benchmark')
+
+import server  # noqa: E402
+
+
+async def seed(days):
+    """Insert rooms plus a few sales, incomes and expenses per day, then build the ledger."""
+    db = server.db
+    await db.client.drop_database(db.name)
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    await db.rooms.insert_many([
+        {"id": f"room-{n}", "room_number": str(100 + n), "room_type": random.choice(["Suite", "Double", "Triple"]), "status": "Available"}
+        for n in range(50)
+    ])
+    sales, incomes, expenses = [], [], []
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        for _ in range(random.randint(2, 8)):
+            sales.append({"date": day, "total_amount": random.uniform(50, 500), "payment_method": random.choice(["Cash", "Card", "Bank Transfer"]), "room_number": str(100 + random.randrange(50))})
+        incomes.append({"income_date": day, "amount": random.uniform(10, 200), "category": random.choice(["Restaurant", "Spa", "Laundry"])})
+        expenses.append({"expense_date": day, "amount": random.uniform(10, 300), "category": random.choice(["Food", "Staff", "Utilities"])})
+    await db.daily_sales.insert_many(sales)
+    await db.incomes.insert_many(incomes)
+    await db.expenses.insert_many(expenses)
+    await server.rebuild_daily_ledger()
+    return len(sales) + len(incomes) + len(expenses)
+
+
+async def time_handler(name, make_call, runs):
+    """Return per-call latencies in milliseconds."""
+    await make_call()  # warm-up
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await make_call()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--days', type=int, default=730, help='days of history to seed')
+    parser.add_argument('--runs', type=int, default=50, help='timed calls per handler and mode')
+    args = parser.parse_args()
+    server.connect()
+
+    print(f"Seeding {args.days} days into {server.db.name}...")
+    records = await seed(args.days)
+    print(f"Seeded {records} records")
+    print("=" * 80)
+
+    year = datetime.now().year
+    handlers = {
+        "reports/monthly": lambda: server.get_monthly_reports(year=year),
+        "reports/comparison": server.get_month_comparison,
+    }
+    concurrent_limit = server.REPORT_QUERY_CONCURRENCY
+    print(f"{'handler':<22}{'sequential p50':>16}{'concurrent p50':>16}{'speedup':>10}")
+    try:
+        for name, make_call in handlers.items():
+            server.REPORT_QUERY_CONCURRENCY = 1
+            sequential = await time_handler(name, make_call, args.runs)
+            server.REPORT_QUERY_CONCURRENCY = concurrent_limit
+            concurrent = await time_handler(name, make_call, args.runs)
+            seq_p50 = statistics.median(sequential)
+            con_p50 = statistics.median(concurrent)
+            print(f"{name:<22}{seq_p50:>14.2f}ms{con_p50:>14.2f}ms{seq_p50 / con_p50:>9.2f}x")
+    finally:
+        await server.db.client.drop_database(server.db.name)
+        server.client.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
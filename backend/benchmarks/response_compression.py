@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Response compression benchmark for the Hotel Management backend.
+
+Seeds a scratch database at realistic sizes (a full hotel of rooms, a page of
+bookings, a year of sales) and requests /rooms, /bookings and /reports/daily
+through the ASGI app with each Accept-Encoding, reporting bytes on the wire,
+compression ratio and the extra server time compression costs per response.
+
+Usage: python benchmarks/response_compression.py [--rooms 150] [--bookings 1000] [--repeat 50]
+Environment: MONGO_URL (default mongodb://localhost:27017),
+             BENCH_DB_NAME (default hotel_benchmark, dropped afterwards)
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ['DB_NAME'] = os.environ.get('BENCH_DB_NAME', 'hotel_benchmark')
+
+import server  # noqa: E402
+
+YEAR_START = date(2025, 1, 1)
+YEAR_END = date(2025, 12, 31)
+
+
+async def seed(rooms, bookings):
+    db = server.db
+    await db.client.drop_database(db.name)
+    await server.ensure_indexes()
+    room_types = ["Single", "Double", "Triple", "Suite"]
+    await db.rooms.insert_many([
+        server.Room(
+            room_number=str(100 + n), room_type=room_types[n % 4], status="Available",
+            price_per_night=5000.0 + 500 * (n % 4), amenities=["WiFi", "TV", "AC", "Mini Fridge"]
+        ).dict()
+        for n in range(rooms)
+    ])
+    await db.bookings.insert_many([
+        server.Booking(
+            guest_name=f"Guest {n}", guest_email=f"guest{n}@example.com", guest_phone="555-0100",
+            guest_country="Sri Lanka", room_number=str(100 + n % rooms),
+            check_in_date=YEAR_START + timedelta(days=n % 360), check_out_date=YEAR_START + timedelta(days=n % 360 + 2),
+            booking_amount=12000.0, status="Completed", additional_notes="Late arrival"
+        ).dict()
+        for n in range(bookings)
+    ])
+    sales = []
+    for day in range((YEAR_END - YEAR_START).days + 1):
+        for n in range(rooms // 3):
+            sales.append(server.DailySale(
+                date=YEAR_START + timedelta(days=day), customer_name=f"Guest {n}", room_number=str(100 + n),
+                room_charges=6000.0, additional_charges=500.0, discount_amount=0.0, advance_amount=1000.0,
+                total_amount=5500.0, payment_method=["Cash", "Card", "Bank Transfer"][n % 3], room_type=room_types[n % 4]
+            ).dict())
+    await db.daily_sales.insert_many(sales)
+    await server.rebuild_daily_ledger()
+
+
+async def call(path, query, accept_encoding):
+    """Run one GET through the full middleware stack; returns (wire bytes, seconds)."""
+    headers = [(b"host", b"benchmark")]
+    if accept_encoding:
+        headers.append((b"accept-encoding", accept_encoding.encode()))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": headers, "client": ("127.0.0.1", 0), "server": ("benchmark", 80),
+    }
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    started = time.perf_counter()
+    await server.app(scope, receive, send)
+    return size, time.perf_counter() - started
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rooms', type=int, default=150, help='rooms in the hotel')
+    parser.add_argument('--bookings', type=int, default=1000, help='bookings (one full /bookings page)')
+    parser.add_argument('--repeat', type=int, default=50, help='requests per endpoint and encoding')
+    args = parser.parse_args()
+    server.connect()
+
+    print(f"Seeding {args.rooms} rooms, {args.bookings} bookings and a year of sales into {server.db.name}...")
+    await seed(args.rooms, args.bookings)
+    encodings = [None] + server.RESPONSE_COMPRESSION
+    endpoints = [
+        ("/api/rooms", ""),
+        ("/api/bookings", ""),
+        ("/api/reports/daily", f"start_date={YEAR_START}&end_date={YEAR_END}"),
+    ]
+    print(f"Encodings: identity, {', '.join(server.RESPONSE_COMPRESSION) or 'none configured'} "
+          f"(minimum size {server.COMPRESSION_MIN_SIZE} bytes)")
+    print("=" * 80)
+    print(f"{'Endpoint':<22}{'encoding':>10}{'bytes':>12}{'ratio':>8}{'p50 ms':>10}{'extra ms':>10}")
+
+    try:
+        for path, query in endpoints:
+            await call(path, query, None)  # warm caches so only encoding differs
+            baseline = None
+            for encoding in encodings:
+                timings = []
+                for _ in range(args.repeat):
+                    size, elapsed = await call(path, query, encoding)
+                    timings.append(elapsed * 1000)
+                p50 = statistics.median(timings)
+                if baseline is None:
+                    baseline = (size, p50)
+                print(f"{path:<22}{encoding or 'identity':>10}{size:>12}{baseline[0] / size:>7.1f}x"
+                      f"{p50:>10.2f}{p50 - baseline[1]:>10.2f}")
+    finally:
+        await server.db.client.drop_database(server.db.name)
+        server.client.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the Hotel Management backend.
+
+Run from the backend directory, e.g. ``python manage.py rebuild-ledger``.
+Uses the same MONGO_URL / DB_NAME settings as the API server.
+"""
+
+import asyncio
+import json
+
+import typer
+
+import server
+
+cli = typer.Typer(help="Hotel Management maintenance commands")
+
+
+@cli.callback()
+def main():
+    """Hotel Management maintenance commands."""
+    server.connect()
+
+
+def run(operation):
+    """Run a server coroutine and wait for its cache sync notices to go out."""
+    async def run_and_flush():
+        result = await operation
+        await server.cache_sync.flush()
+        return result
+    return asyncio.run(run_and_flush())
+
+
+@cli.command("rebuild-ledger")
+def rebuild_ledger():
+    """Recompute the daily_ledger rollup from daily_sales, incomes and expenses."""
+    days = run(server.rebuild_daily_ledger())
+    typer.echo(f"Rebuilt daily ledger: {days} days")
+
+
+@cli.command("rebuild-guests")
+def rebuild_guests():
+    """Recompute the guests profiles from the bookings collection."""
+    guests = run(server.rebuild_guests())
+    typer.echo(f"Rebuilt guest profiles: {guests} guests")
+
+
+@cli.command("apply-indexes")
+def apply_indexes():
+    """Create any missing indexes declared in server.INDEXES."""
+    results = asyncio.run(server.ensure_indexes())
+    for collection, result in results.items():
+        typer.echo(f"{collection}: {result}")
+
+
+@cli.command("index-report")
+def index_report():
+    """Show missing, failed, undeclared and unused indexes per collection."""
+    report = asyncio.run(server.index_report())
+    typer.echo(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    cli()
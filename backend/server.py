@@ -1,26 +1,165 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from bson.codec_options import TypeEncoder, TypeRegistry
+from pymongo import ASCENDING, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, PyMongoError
+from pymongo.monitoring import ConnectionPoolListener
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, ValidationError, create_model
+from typing import List, Optional, get_args
 import uuid
 from datetime import datetime, date, timedelta
 import json
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+import csv
+import io
+import zlib
+import base64
+import numpy as np
+from bisect import bisect_left, insort
+from contextlib import asynccontextmanager
+from functools import lru_cache
+import re
+
+try:
+    import brotli
+except ImportError:  # optional: without it responses are gzip-compressed only
+    brotli = None
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Calendar dates are stored in one canonical form, a midnight BSON datetime, so
+# handlers write plain ``date`` values (in documents and queries alike) and the
+# models accept the midnight datetimes read back for their ``date`` fields.
+class DateCodec(TypeEncoder):
+    python_type = date
+    
+    def transform_python(self, value):
+        return datetime.combine(value, datetime.min.time())
+
 # MongoDB connection
+# The client is created by the app's lifespan (or by connect() in tools), with
+# pool settings taken from the environment when they are set.
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+MONGO_POOL_SETTINGS = {
+    "maxPoolSize": "MONGO_MAX_POOL_SIZE",
+    "minPoolSize": "MONGO_MIN_POOL_SIZE",
+    "maxIdleTimeMS": "MONGO_MAX_IDLE_TIME_MS",
+    "waitQueueTimeoutMS": "MONGO_WAIT_QUEUE_TIMEOUT_MS",
+    "connectTimeoutMS": "MONGO_CONNECT_TIMEOUT_MS",
+    "socketTimeoutMS": "MONGO_SOCKET_TIMEOUT_MS",
+    "serverSelectionTimeoutMS": "MONGO_SERVER_SELECTION_TIMEOUT_MS",
+}
+HEALTH_PING_TIMEOUT = 2.0
+MONGO_POOL_OPTIONS = {option: int(os.environ[name]) for option, name in MONGO_POOL_SETTINGS.items() if os.environ.get(name)}
+
+class PoolMonitor(ConnectionPoolListener):
+    """Connection pool usage per server, tracked from the driver's CMAP events.
+    
+    Events arrive on driver threads, so the counters are guarded by a lock.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pools = {}
+    
+    def _count(self, address, **deltas):
+        with self.lock:
+            pool = self.pools.setdefault(f"{address[0]}:{address[1]}", {"open": 0, "checked_out": 0, "waiters": 0, "checkout_failures": 0})
+            for name, delta in deltas.items():
+                pool[name] += delta
+    
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {address: dict(pool) for address, pool in self.pools.items()}
+    
+    def pool_created(self, event):
+        self._count(event.address)
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        with self.lock:
+            self.pools.pop(f"{event.address[0]}:{event.address[1]}", None)
+    
+    def connection_created(self, event):
+        self._count(event.address, open=1)
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        self._count(event.address, open=-1)
+    
+    def connection_check_out_started(self, event):
+        self._count(event.address, waiters=1)
+    
+    def connection_check_out_failed(self, event):
+        self._count(event.address, waiters=-1, checkout_failures=1)
+    
+    def connection_checked_out(self, event):
+        self._count(event.address, waiters=-1, checked_out=1)
+    
+    def connection_checked_in(self, event):
+        self._count(event.address, checked_out=-1)
+
+client = None
+db = None
+pool_monitor = None
+
+def connect():
+    """Create this process's MongoDB client and database handle."""
+    global client, db, pool_monitor, _transactions_supported
+    pool_monitor = PoolMonitor()
+    client = AsyncIOMotorClient(
+        mongo_url,
+        type_registry=TypeRegistry([DateCodec()]),
+        event_listeners=[pool_monitor],
+        **MONGO_POOL_OPTIONS
+    )
+    db = client[os.environ['DB_NAME']]
+    _transactions_supported = None
+    return db
+
+async def prewarm_pool():
+    """Open minPoolSize connections up front so the first requests don't pay for them."""
+    await client.admin.command("ping")
+    warm = MONGO_POOL_OPTIONS.get("minPoolSize", 0)
+    if warm > 1:
+        # Concurrent commands each need their own connection
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(warm)))
+
+@asynccontextmanager
+async def lifespan(app):
+    connect()
+    await prewarm_pool()
+    await prepare_database()
+    yield
+    await cache_sync.stop()
+    await events.stop()
+    client.close()
+
+# Upper bound on database queries a single report request runs concurrently
+REPORT_QUERY_CONCURRENCY = int(os.environ.get('REPORT_QUERY_CONCURRENCY', '4'))
+# Number of report results kept in the in-process report cache
+REPORT_CACHE_SIZE = int(os.environ.get('REPORT_CACHE_SIZE', '256'))
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -76,6 +215,9 @@ class BookingCreate(BaseModel):
     booking_amount: float = 0.0
     additional_notes: str = ""
 
+# Largest batch accepted by POST /api/bookings/bulk
+MAX_BULK_BOOKINGS = 500
+
 class BookingUpdate(BaseModel):
     check_in_date: Optional[date] = None
     check_out_date: Optional[date] = None
@@ -87,6 +229,7 @@ class Customer(BaseModel):
     email: str
     phone: str
     current_room: str
+    booking_id: str = ""  # Booking the customer checked in from
     check_in_date: date
     check_out_date: date
     advance_amount: float = 0.0
@@ -113,6 +256,7 @@ class DailySale(BaseModel):
     advance_amount: float
     total_amount: float
     payment_method: str
+    room_type: str = ""  # Snapshot of the room type at checkout
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class CheckinRequest(BaseModel):
@@ -159,33 +303,1036 @@ class FinancialSummary(BaseModel):
     period_start: date
     period_end: date
 
-# Room Management Routes
-@api_router.get("/rooms", response_model=List[Room])
-async def get_rooms():
-    rooms = await db.rooms.find().to_list(1000)
-    
-    # Convert datetime back to date for response
-    for room in rooms:
-        if isinstance(room.get('check_in_date'), datetime):
-            room['check_in_date'] = room['check_in_date'].date()
-        if isinstance(room.get('check_out_date'), datetime):
-            room['check_out_date'] = room['check_out_date'].date()
+# Multi-document writes
+class WriteSet:
+    """The writes of one operation that must succeed or fail together.
+    
+    On a replica set ``session`` carries a transaction and must be passed to every
+    operation. On a standalone server ``session`` is None and the compensating
+    steps registered with ``on_rollback`` undo completed writes instead.
+    """
+    
+    def __init__(self, session=None):
+        self.session = session
+        self.compensations = []
+    
+    def on_rollback(self, undo):
+        """Register a coroutine function that reverts the write just made."""
+        if self.session is None:
+            self.compensations.append(undo)
+
+_transactions_supported = None
+
+async def transactions_supported() -> bool:
+    """Multi-document transactions need a replica set or sharded cluster."""
+    global _transactions_supported
+    if _transactions_supported is None:
+        hello = await client.admin.command("hello")
+        _transactions_supported = "setName" in hello or hello.get("msg") == "isdbgrid"
+    return _transactions_supported
+
+@asynccontextmanager
+async def write_set():
+    """Run a group of writes in a transaction, or with compensating steps.
+    
+    Any exception inside the block (including HTTPException) aborts the
+    transaction or runs the compensations in reverse order, then propagates.
+    """
+    try:
+        if await transactions_supported():
+            async with await client.start_session() as session:
+                async with session.start_transaction():
+                    yield WriteSet(session)
+            return
+        
+        writes = WriteSet()
+        try:
+            yield writes
+        except BaseException:
+            for undo in reversed(writes.compensations):
+                try:
+                    await undo()
+                except PyMongoError:
+                    logger.exception("Compensating write failed")
+            raise
+    except PyMongoError as e:
+        if e.has_error_label("TransientTransactionError"):
+            raise HTTPException(status_code=409, detail="Concurrent update, please retry")
+        raise
+
+# Index management
+# Every index the handlers rely on, per collection. ensure_indexes() creates them
+# idempotently at startup and `python manage.py apply-indexes` applies them to an
+# existing database.
+INDEXES = {
+    "rooms": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("room_number", ASCENDING)], name="room_number_unique", unique=True),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id"),
+    ],
+    "bookings": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("guest_email", ASCENDING)], name="guest_email"),
+        IndexModel([("room_number", ASCENDING), ("status", ASCENDING)], name="room_number_status"),
+        IndexModel([("status", ASCENDING), ("check_in_date", ASCENDING)], name="status_check_in_date"),
+        IndexModel([("status", ASCENDING), ("check_out_date", ASCENDING)], name="status_check_out_date"),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id"),
+    ],
+    "customers": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("current_room", ASCENDING)], name="current_room"),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id"),
+    ],
+    "expenses": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("expense_date", ASCENDING), ("id", ASCENDING)], name="expense_date_id"),
+    ],
+    "incomes": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("income_date", ASCENDING), ("id", ASCENDING)], name="income_date_id"),
+    ],
+    "daily_sales": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("date", ASCENDING), ("id", ASCENDING)], name="date_id"),
+    ],
+    "daily_ledger": [
+        IndexModel([("date", ASCENDING)], name="date_unique", unique=True),
+    ],
+    "guests": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("name", ASCENDING), ("id", ASCENDING)], name="name_id"),
+        IndexModel([("search_keys", ASCENDING)], name="search_keys"),
+    ],
+}
+
+async def ensure_indexes() -> dict:
+    """Create every declared index that is missing; existing ones are left untouched.
+    
+    Each index is created on its own, so one that can't be built (e.g. a unique
+    index over duplicate room numbers in legacy data) doesn't hold back the rest.
+    Failures are logged, returned and kept in ``index_failures`` for index_report().
+    """
+    results = {}
+    for collection, indexes in INDEXES.items():
+        results[collection] = {}
+        failed = []
+        for index in indexes:
+            name = index.document["name"]
+            try:
+                await db[collection].create_indexes([index])
+                results[collection][name] = "ok"
+            except OperationFailure as e:
+                logger.error("Could not create index %s on %s: %s", name, collection, e)
+                results[collection][name] = f"error: {e}"
+                failed.append(name)
+                await db.index_failures.replace_one(
+                    {"_id": f"{collection}.{name}"},
+                    {"collection": collection, "index": name, "error": str(e), "at": datetime.utcnow()},
+                    upsert=True
+                )
+        await db.index_failures.delete_many({"collection": collection, "index": {"$nin": failed}})
+    return results
+
+async def index_report() -> dict:
+    """Compare declared indexes with the database.
+    
+    Lists declared indexes that are missing, the error that kept each failed one
+    from being built at the last ensure_indexes(), indexes present but not
+    declared, and indexes with no recorded use since the server started ($indexStats).
+    """
+    report = {}
+    failures = {}
+    async for failure in db.index_failures.find():
+        failures.setdefault(failure["collection"], {})[failure["index"]] = failure["error"]
+    for collection, indexes in INDEXES.items():
+        declared = {index.document["name"] for index in indexes}
+        existing = set((await db[collection].index_information()).keys()) - {"_id_"}
+        try:
+            stats = await db[collection].aggregate([{"$indexStats": {}}]).to_list(None)
+            unused = sorted(stat["name"] for stat in stats if stat["name"] != "_id_" and stat["accesses"]["ops"] == 0)
+        except OperationFailure:
+            unused = []
+        report[collection] = {
+            "missing": sorted(declared - existing),
+            "failed": failures.get(collection, {}),
+            "undeclared": sorted(existing - declared),
+            "unused": unused,
+        }
+    return report
+
+async def replace_collection(name: str, documents: list):
+    """Swap in new contents for a derived collection.
+    
+    The documents are written and indexed in a scratch collection which is then
+    renamed over ``name``, so readers never observe a half-built collection. The
+    scratch name is unique per call, so concurrent rebuilds can't trip over each other.
+    """
+    if not documents:
+        await db[name].delete_many({})
+        return
+    scratch = db[f"{name}_rebuild_{uuid.uuid4().hex}"]
+    try:
+        await scratch.insert_many(documents)
+        await scratch.create_indexes(INDEXES[name])
+        await scratch.rename(name, dropTarget=True)
+    except PyMongoError:
+        await scratch.drop()
+        raise
+
+# Startup backfills
+# Several workers start at once against the same database; a claim document in
+# ``startup_claims`` lets one of them backfill an empty derived collection while
+# the others wait for it. A claim older than BACKFILL_CLAIM_SECONDS is taken to
+# belong to a worker that died mid-rebuild.
+BACKFILL_CLAIM_SECONDS = 600
+
+async def claim_backfill(name: str) -> bool:
+    now = datetime.utcnow()
+    try:
+        await db.startup_claims.update_one(
+            {"_id": name, "claimed_at": {"$lt": now - timedelta(seconds=BACKFILL_CLAIM_SECONDS)}},
+            {"$set": {"claimed_at": now}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        # A live claim exists, so the upsert tried to insert a second one
+        return False
+
+async def backfill(name: str, rebuild) -> Optional[int]:
+    """Run ``rebuild`` if collection ``name`` is empty, in only one starting worker.
+    
+    Returns what ``rebuild`` returned, or None if there was nothing to do or
+    another worker did it (this one waits until it has finished).
+    """
+    if await db[name].estimated_document_count() > 0:
+        return None
+    if await claim_backfill(name):
+        try:
+            return await rebuild()
+        finally:
+            await db.startup_claims.delete_one({"_id": name})
+    deadline = time.monotonic() + BACKFILL_CLAIM_SECONDS
+    while time.monotonic() < deadline and await db.startup_claims.find_one({"_id": name}, {"_id": 1}):
+        await asyncio.sleep(0.5)
+    return None
+
+# Daily ledger rollup
+# One tiny document per calendar day in ``daily_ledger`` holding the totals every
+# report needs. Write handlers keep it current with atomic ``$inc`` updates so
+# reports read O(days) ledger documents instead of O(transactions) raw records.
+LEDGER_SOURCES = {
+    "daily_sales": {
+        "date_field": "date",
+        "amount_field": "total_amount",
+        "total": "room_revenue",
+        "count": "sales_count",
+        "breakdowns": {
+            "payment_methods": ("payment_method", "Unknown"),
+            # Sales without a known room type are left out of the room type breakdown
+            "room_types": ("room_type", None),
+        },
+        # Sales recorded before room types were snapshotted take the current room's type
+        "backfill": [
+            {"$lookup": {"from": "rooms", "localField": "room_number", "foreignField": "room_number", "as": "room"}},
+            {"$addFields": {"room_type": {"$ifNull": ["$room_type", {"$arrayElemAt": ["$room.room_type", 0]}]}}}
+        ],
+    },
+    "incomes": {
+        "date_field": "income_date",
+        "amount_field": "amount",
+        "total": "additional_income",
+        "count": "income_count",
+        "breakdowns": {
+            "income_categories": ("category", "Other"),
+        },
+    },
+    "expenses": {
+        "date_field": "expense_date",
+        "amount_field": "amount",
+        "total": "expenses",
+        "count": "expenses_count",
+        "breakdowns": {
+            "expense_categories": ("category", "Other"),
+        },
+    },
+}
+
+LEDGER_TOTALS = ["room_revenue", "sales_count", "additional_income", "income_count", "expenses", "expenses_count"]
+LEDGER_BREAKDOWNS = ["payment_methods", "room_types", "income_categories", "expense_categories"]
+
+def as_date(value) -> date:
+    """Normalize a stored (datetime), parsed (date) or raw (string) date value to a date."""
+    if isinstance(value, str):
+        value = datetime.strptime(value[:10], '%Y-%m-%d')
+    if isinstance(value, datetime):
+        value = value.date()
+    return value
+
+def ledger_day(value) -> datetime:
+    """Normalize a stored or incoming date value to the ledger's midnight datetime key."""
+    return datetime.combine(as_date(value), datetime.min.time())
+
+# Field names can't contain "." or "$"; they are escaped reversibly so reports
+# show the original category and payment method names
+LEDGER_KEY_ESCAPES = [("%", "%25"), (".", "%2E"), ("$", "%24")]
+
+def ledger_key(name) -> str:
+    """Make a category or payment method usable as a field name in an $inc path."""
+    key = str(name)
+    for character, escape in LEDGER_KEY_ESCAPES:
+        key = key.replace(character, escape)
+    return key
+
+def ledger_name(key: str) -> str:
+    """The category or payment method a ledger field name stands for."""
+    for character, escape in reversed(LEDGER_KEY_ESCAPES):
+        key = key.replace(escape, character)
+    return key
+
+def ledger_delta(source: str, record: dict, sign: int = 1) -> dict:
+    """Build the $inc document that adds (sign=1) or removes (sign=-1) a record."""
+    spec = LEDGER_SOURCES[source]
+    amount = record.get(spec["amount_field"], 0) * sign
+    delta = {spec["total"]: amount, spec["count"]: sign}
+    for breakdown, (field, default_key) in spec["breakdowns"].items():
+        key = record.get(field) or default_key
+        if key is not None:
+            delta[f"{breakdown}.{ledger_key(key)}"] = amount
+    return delta
+
+async def record_in_ledger(source: str, record: dict, sign: int = 1, session=None):
+    """Apply a raw record to its day in the ledger with a single atomic upsert."""
+    day = ledger_day(record[LEDGER_SOURCES[source]["date_field"]])
+    await db.daily_ledger.update_one(
+        {"date": day},
+        {"$inc": ledger_delta(source, record, sign)},
+        upsert=True,
+        session=session
+    )
+    report_cache.invalidate(day.date())
+
+def sum_ledger(entries) -> dict:
+    """Add up ledger documents into period totals and merged breakdowns."""
+    summary = {field: 0 for field in LEDGER_TOTALS}
+    for breakdown in LEDGER_BREAKDOWNS:
+        summary[breakdown] = {}
+    for entry in entries:
+        for field in LEDGER_TOTALS:
+            summary[field] += entry.get(field, 0)
+        for breakdown in LEDGER_BREAKDOWNS:
+            for key, amount in (entry.get(breakdown) or {}).items():
+                name = ledger_name(key)
+                summary[breakdown][name] = summary[breakdown].get(name, 0) + amount
+    # Float $inc leaves residue like 5.55e-17 once a record is deleted again, so
+    # amounts are rounded to cents; zeroed keys of deleted records are dropped
+    for field in LEDGER_TOTALS:
+        summary[field] = round(summary[field], 2)
+    for breakdown in LEDGER_BREAKDOWNS:
+        rounded = {key: round(amount, 2) for key, amount in summary[breakdown].items()}
+        summary[breakdown] = {key: amount for key, amount in rounded.items() if amount}
+    return summary
+
+async def read_ledger(start_datetime: datetime, end_datetime: datetime, breakdowns: bool = True) -> list:
+    """Fetch the ledger documents for a date range, oldest first."""
+    projection = {"_id": 0}
+    if not breakdowns:
+        for breakdown in LEDGER_BREAKDOWNS:
+            projection[breakdown] = 0
+    return await db.daily_ledger.find(
+        {"date": {"$gte": start_datetime, "$lte": end_datetime}},
+        projection
+    ).sort("date", 1).to_list(None)
+
+async def rebuild_daily_ledger() -> int:
+    """Recompute the whole ledger from daily_sales, incomes and expenses.
+    
+    The new ledger is built in a scratch collection and swapped in with a rename,
+    so readers never observe a half-built ledger. Returns the number of days written.
+    """
+    ledger = {}
+    for source, spec in LEDGER_SOURCES.items():
+        group_id = {"day": {"$dateToString": {"format": "%Y-%m-%d", "date": f"${spec['date_field']}"}}}
+        for field, _ in spec["breakdowns"].values():
+            group_id[field] = f"${field}"
+        pipeline = [
+            {"$match": {spec["date_field"]: {"$ne": None}}},
+            *spec.get("backfill", []),
+            {"$group": {
+                "_id": group_id,
+                "total": {"$sum": f"${spec['amount_field']}"},
+                "count": {"$sum": 1}
+            }}
+        ]
+        async for row in db[source].aggregate(pipeline):
+            day = ledger_day(row["_id"]["day"])
+            entry = ledger.setdefault(day, {"date": day})
+            entry[spec["total"]] = entry.get(spec["total"], 0) + row["total"]
+            entry[spec["count"]] = entry.get(spec["count"], 0) + row["count"]
+            for breakdown, (field, default_key) in spec["breakdowns"].items():
+                key = row["_id"].get(field) or default_key
+                if key is None:
+                    continue
+                subtotals = entry.setdefault(breakdown, {})
+                subtotals[ledger_key(key)] = subtotals.get(ledger_key(key), 0) + row["total"]
+    
+    await replace_collection("daily_ledger", list(ledger.values()))
+    report_cache.clear()
+    record_write("daily_ledger", announce=True)
+    return len(ledger)
+
+# Report result cache
+class ReportCache:
+    """In-process LRU cache of report results keyed by endpoint and date range.
+    
+    Writes invalidate only the cached reports whose range covers the dates they
+    touched. ``generation`` lets a report computed concurrently with a write
+    detect that its result may already be stale and skip caching it.
+    """
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+    
+    def put(self, key, result, generation: int):
+        if generation != self.generation:
+            return
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate(self, start: date, end: Optional[date] = None, endpoints: Optional[tuple] = None):
+        """Drop cached reports overlapping ``start``..``end`` (a single day by default)."""
+        end = end or start
+        self.generation += 1
+        stale = [
+            key for key in self.entries
+            if (endpoints is None or key[0] in endpoints) and key[1] <= end and start <= key[2]
+        ]
+        for key in stale:
+            del self.entries[key]
+        self.invalidations += len(stale)
+    
+    def invalidate_endpoint(self, *endpoints: str):
+        """Drop every cached result of the given endpoints, whatever its range."""
+        self.invalidate(date.min, date.max, endpoints=endpoints)
+    
+    def clear(self):
+        self.generation += 1
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+report_cache = ReportCache(REPORT_CACHE_SIZE)
+
+# Reports whose results depend on the number of rooms
+ROOM_COUNT_REPORTS = ("reports/monthly", "reports/occupancy")
+
+# Keyset pagination
+# List endpoints return one page in a stable (sort field, id) order and put an
+# opaque cursor for the next page in the X-Next-Cursor response header.
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(doc: dict, sort_field: str) -> str:
+    value = doc.get(sort_field)
+    is_datetime = isinstance(value, datetime)
+    if is_datetime:
+        value = value.isoformat()
+    payload = json.dumps([value, doc.get("id"), is_datetime]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        value, last_id, is_datetime = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (datetime.fromisoformat(value) if is_datetime else value), last_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+async def fetch_page(collection, query: dict, sort_field: str, direction: int, limit: int, after: Optional[str], response: Response, projection: Optional[dict] = None) -> list:
+    """Fetch one page of ``collection`` ordered by (sort_field, id).
+    
+    ``after`` is the cursor returned with the previous page. When more documents
+    follow, the cursor for the next page is set on ``response``.
+    """
+    if after:
+        value, last_id = decode_cursor(after)
+        op = "$gt" if direction == 1 else "$lt"
+        query = {"$and": [query, {"$or": [
+            {sort_field: {op: value}},
+            {sort_field: value, "id": {op: last_id}}
+        ]}]}
+    
+    docs = await collection.find(query, projection).sort([(sort_field, direction), ("id", direction)]).limit(limit + 1).to_list(limit + 1)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(docs[-1], sort_field)
+    return docs
+
+# Conditional GET
+# Each collection has a version counter bumped after every committed write. List
+# endpoints derive their ETag from the versions alone, so a matching If-None-Match
+# is answered with 304 before any query runs. The epoch keeps ETags from two
+# server processes (whose counters are unrelated) from ever matching.
+class CollectionVersions:
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.versions = {}
+    
+    def bump(self, *collections: str):
+        for collection in collections:
+            self.versions[collection] = self.versions.get(collection, 0) + 1
+    
+    def etag(self, collections, *extra) -> str:
+        parts = [self.epoch, *(str(self.versions.get(collection, 0)) for collection in collections), *extra]
+        return f'W/"{"-".join(parts)}"'
+
+collection_versions = CollectionVersions()
+
+def conditional(*collections: str, daily: bool = False):
+    """Dependency answering If-None-Match for a list built from ``collections``.
+    
+    ``daily`` adds today's date to the ETag for lists that depend on the date.
+    """
+    async def check(response: Response, if_none_match: Optional[str] = Header(None)):
+        extra = [date.today().isoformat()] if daily else []
+        etag = collection_versions.etag(collections, *extra)
+        if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+    return Depends(check)
+
+def record_write(*collections: str, announce: bool = False):
+    """Note a committed write: new ETags here, and a cache sync notice for other workers.
+    
+    ``announce`` sends the notice even with CACHE_SYNC off, for rebuilds that replace
+    a whole collection, often from ``manage.py`` while the API is running.
+    """
+    collection_versions.bump(*collections)
+    cache_sync.publish(*collections, always=announce)
+
+def record_change(collection: str, op: str, doc_id: str, fields: Optional[dict] = None):
+    """Note a committed write to rooms, bookings or customers.
     
-    return [Room(**room) for room in rooms]
+    New ETags for the collection and a live event for /api/events subscribers.
+    """
+    record_write(collection)
+    events.publish(collection, op, doc_id, fields)
+
+# Cross-worker cache sync
+# Every worker process keeps its own caches (report results, room intervals and
+# catalog, list ETags). With CACHE_SYNC on, each committed write also bumps the
+# collection's counter in ``cache_versions``; every worker follows that collection
+# (a change stream on a replica set, polling otherwise) and refreshes the caches
+# another process's writes made stale, and booking conflict checks are confirmed
+# against the database, since this worker's interval index may lag behind.
+#
+# Servers follow ``cache_versions`` even with CACHE_SYNC off, so a collection rebuilt
+# by ``manage.py`` reaches a running API; only those rebuilds publish then.
+#
+# Set CACHE_SYNC=true whenever several processes serve one database. It defaults on
+# only when WEB_CONCURRENCY asks for more than one worker: uvicorn and gunicorn take
+# their worker count from it, so ``WEB_CONCURRENCY=4 uvicorn server:app`` runs four
+# synced workers. ``uvicorn --workers 4`` alone does not set it.
+CACHE_SYNC = os.environ.get('CACHE_SYNC', str(int(os.environ.get('WEB_CONCURRENCY', '1')) > 1)).lower() in ('1', 'true', 'yes')
+CACHE_SYNC_INTERVAL = float(os.environ.get('CACHE_SYNC_INTERVAL', '1.0'))
+
+class CacheSync:
+    """Share committed writes between processes through ``cache_versions``.
+    
+    ``applied`` holds, per collection, the shared version this process's caches
+    reflect. Versions this process's own writes produced (``own``) were applied in
+    place and are stepped over, whatever order their replies arrive in; anything
+    else was written by another process and triggers a refresh.
+    """
+    
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.applied = {}
+        self.own = {}
+        self.pending = set()
+        self.listener = None
+        self.refreshes = 0
+    
+    def publish(self, *collections: str, always: bool = False):
+        if not (self.enabled or always):
+            return
+        task = asyncio.create_task(self._publish(collections))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+    
+    async def _publish(self, collections):
+        for collection in collections:
+            try:
+                shared = await db.cache_versions.find_one_and_update(
+                    {"_id": collection},
+                    {"$inc": {"version": 1}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+            except PyMongoError as e:
+                logger.warning("Could not publish cache change for %s: %s", collection, e)
+                continue
+            self.own.setdefault(collection, set()).add(shared["version"])
+            self.advance(collection)
+    
+    def advance(self, collection: str):
+        """Step ``applied`` over this process's own versions."""
+        own = self.own.get(collection, set())
+        version = self.applied.get(collection, 0)
+        while version + 1 in own:
+            version += 1
+        self.applied[collection] = version
+        own.difference_update([seen for seen in own if seen <= version])
+    
+    async def flush(self):
+        """Wait until this process's writes are published (short-lived tools exit right after)."""
+        if self.pending:
+            await asyncio.gather(*self.pending)
+    
+    async def load_versions(self):
+        """Record the shared versions; call before loading the caches they describe."""
+        async for doc in db.cache_versions.find():
+            self.applied[doc["_id"]] = doc["version"]
+    
+    async def start(self):
+        follow = self.watch if await transactions_supported() else self.poll
+        self.listener = asyncio.create_task(follow())
+    
+    async def stop(self):
+        if self.listener:
+            self.listener.cancel()
+            self.listener = None
+        await self.flush()
+    
+    async def apply(self, collection: str, version: int):
+        self.advance(collection)
+        if version > self.applied.get(collection, 0):
+            await refresh_caches(collection)
+            self.applied[collection] = max(version, self.applied.get(collection, 0))
+            self.advance(collection)
+            self.refreshes += 1
+    
+    async def catch_up(self):
+        async for doc in db.cache_versions.find():
+            await self.apply(doc["_id"], doc["version"])
+    
+    async def poll(self):
+        while True:
+            await asyncio.sleep(CACHE_SYNC_INTERVAL)
+            try:
+                await self.catch_up()
+            except PyMongoError as e:
+                logger.warning("Cache version poll failed: %s", e)
+    
+    async def watch(self):
+        resume_token = None
+        while True:
+            try:
+                async with db.cache_versions.watch(full_document="updateLookup", resume_after=resume_token) as stream:
+                    # Anything bumped before the stream opened is only visible by reading
+                    await self.catch_up()
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        document = change.get("fullDocument")
+                        if document:
+                            await self.apply(document["_id"], document["version"])
+            except PyMongoError as e:
+                logger.warning("Cache version stream interrupted, resuming: %s", e)
+                await asyncio.sleep(1)
+
+cache_sync = CacheSync(CACHE_SYNC)
+
+async def refresh_caches(collection: str):
+    """Bring this process's caches up to date after another process wrote ``collection``."""
+    if collection == "rooms":
+        await load_room_catalog()
+        report_cache.invalidate_endpoint(*ROOM_COUNT_REPORTS)
+    elif collection == "bookings":
+        await load_room_intervals()
+        report_cache.clear()
+    elif collection in LEDGER_SOURCES or collection == "daily_ledger":
+        report_cache.clear()
+    collection_versions.bump(collection)
+    if collection in EVENT_COLLECTIONS:
+        # Without a change stream these subscribers never saw the write itself
+        events.resync()
+
+# List responses
+# Opt-in with FAST_LIST_RESPONSES=true: list handlers fetch only the model's fields
+# (no _id), render stored dates once and encode the documents straight to JSON
+# with orjson, skipping model construction, response_model validation and the
+# stdlib encoder. The output is the same as the validated path's. Either path
+# can be narrowed with ``fields=``, which becomes a projection.
+FAST_LIST_RESPONSES = os.environ.get('FAST_LIST_RESPONSES', 'false').lower() in ('1', 'true', 'yes')
+
+class ListShape:
+    """Projection and rendering of one response model's documents."""
+    
+    def __init__(self, model):
+        fields = model.model_fields
+        self.projection = {"_id": 0, **{name: 1 for name in fields}}
+        # Fields missing from older documents fall back to the model default
+        self.template = {
+            name: None if field.is_required() or field.default_factory else field.default
+            for name, field in fields.items()
+        }
+        self.date_fields = [name for name, field in fields.items() if date in (field.annotation, *get_args(field.annotation))]
+    
+    def render(self, docs: list, headers) -> ORJSONResponse:
+        rows = []
+        for doc in docs:
+            row = {**self.template, **doc}
+            for name in self.date_fields:
+                if isinstance(row[name], datetime):
+                    row[name] = row[name].date()
+            rows.append(row)
+        return ORJSONResponse(rows, headers=dict(headers))
+
+@lru_cache(maxsize=256)
+def list_shape(model) -> ListShape:
+    return ListShape(model)
+
+@lru_cache(maxsize=256)
+def partial_model(model, names: tuple):
+    """A response model with only ``names`` of ``model``'s fields."""
+    return create_model(
+        f"{model.__name__}Partial",
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in names}
+    )
+
+def response_model_for(model, fields: Optional[str]):
+    """The model a ``fields=`` selection asks for; 400 on unknown field names."""
+    if not fields:
+        return model
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if not requested:
+        raise HTTPException(status_code=400, detail="fields must name at least one field")
+    unknown = sorted(requested - set(model.model_fields))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown {model.__name__} fields: {', '.join(unknown)}")
+    if requested == set(model.model_fields):
+        return model
+    # Model field order keeps one cached partial model per selection
+    return partial_model(model, tuple(name for name in model.model_fields if name in requested))
+
+async def list_page(model, collection, query: dict, sort_field: str, direction: int, limit: int, after: Optional[str], response: Response, fields: Optional[str] = None):
+    """One page of a list endpoint, optionally limited to a ``fields=`` selection.
+    
+    The selection is pushed down as a projection and validated against a partial
+    model. Full pages on the default path are returned as model instances for the
+    route's response_model; everything else is returned as a finished response.
+    """
+    response_model = response_model_for(model, fields)
+    if response_model is model and not FAST_LIST_RESPONSES:
+        docs = await fetch_page(collection, query, sort_field, direction, limit, after, response)
+        return [model(**doc) for doc in docs]
+    
+    shape = list_shape(response_model)
+    # The cursor needs the sort key and id even when they were not selected
+    docs = await fetch_page(collection, query, sort_field, direction, limit, after, response, projection={**shape.projection, sort_field: 1, "id": 1})
+    # A returned response replaces the injected one, so carry its headers over
+    if not FAST_LIST_RESPONSES:
+        return JSONResponse([response_model(**doc).model_dump(mode="json") for doc in docs], headers=dict(response.headers))
+    
+    unselected = {sort_field, "id"} - set(shape.template)
+    if unselected:
+        for doc in docs:
+            for name in unselected:
+                doc.pop(name, None)
+    return shape.render(docs, response.headers)
+
+# Booking conflict detection
+# Bookings that hold their room and must not overlap another booking
+ACTIVE_BOOKING_STATUSES = ["Upcoming", "Checked-in"]
+
+class RoomStays:
+    """Stays of one room sorted by first night, with a running maximum of their ends.
+    
+    ``max_ends[i]`` is the latest end among stays ``0..i``, so a binary search on
+    the starts plus one lookup answers "does anything overlap?" in O(log n).
+    """
+    
+    def __init__(self):
+        self.stays = []  # (start, end, booking_id), sorted
+        self.starts = []
+        self.max_ends = []
+    
+    def _reindex(self, position: int):
+        self.starts[position:] = [stay[0] for stay in self.stays[position:]]
+        running = self.max_ends[position - 1] if position else date.min
+        self.max_ends[position:] = []
+        for _, end, _ in self.stays[position:]:
+            running = max(running, end)
+            self.max_ends.append(running)
+    
+    def add(self, start: date, end: date, booking_id: str):
+        stay = (start, end, booking_id)
+        insort(self.stays, stay)
+        self._reindex(self.stays.index(stay))
+    
+    def remove(self, start: date, end: date, booking_id: str):
+        position = self.stays.index((start, end, booking_id))
+        del self.stays[position]
+        self._reindex(position)
+    
+    def overlapping(self, start: date, end: date, exclude_id: Optional[str] = None) -> Optional[tuple]:
+        """Return a stay overlapping [start, end), ignoring ``exclude_id``."""
+        # Only stays that begin before ``end`` can overlap
+        position = bisect_left(self.starts, end) - 1
+        while position >= 0 and self.max_ends[position] > start:
+            stay = self.stays[position]
+            if stay[1] > start and stay[2] != exclude_id:
+                return stay
+            position -= 1
+        return None
+
+class RoomIntervalIndex:
+    """In-memory index of active booking stays per room.
+    
+    Rebuilt from the bookings collection at startup and kept current by every
+    handler that creates, moves, cancels or ends a booking.
+    """
+    
+    def __init__(self):
+        self.rooms = {}
+        self.bookings = {}  # booking_id -> (room_number, start, end)
+        self.journal = None  # changes made while a reload reads the bookings
+    
+    def rebuild(self, bookings: list):
+        self.rooms = {}
+        self.bookings = {}
+        for booking in bookings:
+            self.add(booking)
+    
+    def add(self, booking: dict):
+        """Index (or re-index) a booking's stay."""
+        self.remove(booking["id"])
+        start, end = stay_nights(as_date(booking["check_in_date"]), as_date(booking["check_out_date"]))
+        self.rooms.setdefault(booking["room_number"], RoomStays()).add(start, end, booking["id"])
+        self.bookings[booking["id"]] = (booking["room_number"], start, end)
+        if self.journal is not None:
+            self.journal.append((self.add, booking))
+    
+    def remove(self, booking_id: str):
+        if self.journal is not None:
+            self.journal.append((self.remove, booking_id))
+        if booking_id in self.bookings:
+            room_number, start, end = self.bookings.pop(booking_id)
+            self.rooms[room_number].remove(start, end, booking_id)
+    
+    def find_conflict(self, room_number: str, check_in: date, check_out: date, exclude_id: Optional[str] = None) -> Optional[str]:
+        """Return the id of an active booking overlapping the stay, if any."""
+        stays = self.rooms.get(room_number)
+        if not stays:
+            return None
+        start, end = stay_nights(check_in, check_out)
+        conflict = stays.overlapping(start, end, exclude_id)
+        return conflict[2] if conflict else None
+
+room_intervals = RoomIntervalIndex()
+
+async def reload_index(index, cursor):
+    """Rebuild an in-memory index from ``cursor``.
+    
+    Handlers keep changing the index while the documents are read; those changes
+    are journaled and replayed on top of the rebuilt index.
+    """
+    index.journal = []
+    try:
+        documents = await cursor.to_list(None)
+    finally:
+        journal, index.journal = index.journal, None
+    index.rebuild(documents)
+    for change, argument in journal:
+        change(argument)
+
+async def load_room_intervals():
+    await reload_index(room_intervals, db.bookings.find(
+        {"status": {"$in": ACTIVE_BOOKING_STATUSES}},
+        {"_id": 0, "id": 1, "room_number": 1, "check_in_date": 1, "check_out_date": 1}
+    ))
+
+def reserve_stay(booking: dict, exclude_id: Optional[str] = None):
+    """Check a stay against the interval index and claim it, or raise 409.
+    
+    Check and claim happen without awaiting, so concurrent requests in this
+    process can't both pass the check.
+    """
+    conflict = room_intervals.find_conflict(
+        booking["room_number"], as_date(booking["check_in_date"]), as_date(booking["check_out_date"]), exclude_id
+    )
+    if conflict:
+        raise stay_conflict(booking, conflict)
+    room_intervals.add(booking)
+
+def stay_conflict(booking: dict, conflict_id: str) -> HTTPException:
+    return HTTPException(status_code=409, detail=f"Room {booking['room_number']} is already booked for these dates (booking {conflict_id})")
+
+async def stored_conflicts(bookings: list) -> dict:
+    """Check stays against the bookings collection rather than this worker's index.
+    
+    Returns {booking id: id of a stored active booking overlapping it}. The given
+    bookings are not checked against themselves or each other.
+    """
+    stays = [stay_nights(as_date(booking["check_in_date"]), as_date(booking["check_out_date"])) for booking in bookings]
+    # Served by the room_number_status index; exact overlap is decided below
+    stored = await db.bookings.find(
+        {
+            "room_number": {"$in": list({booking["room_number"] for booking in bookings})},
+            "status": {"$in": ACTIVE_BOOKING_STATUSES},
+            "check_in_date": {"$lt": max(end for _, end in stays)},
+            "check_out_date": {"$gte": min(start for start, _ in stays)},
+            "id": {"$nin": [booking["id"] for booking in bookings]}
+        },
+        {"_id": 0, "id": 1, "room_number": 1, "check_in_date": 1, "check_out_date": 1}
+    ).to_list(None)
+    index = RoomIntervalIndex()
+    index.rebuild(stored)
+    conflicts = {}
+    for booking in bookings:
+        conflict = index.find_conflict(booking["room_number"], as_date(booking["check_in_date"]), as_date(booking["check_out_date"]))
+        if conflict:
+            conflicts[booking["id"]] = conflict
+    return conflicts
+
+async def confirm_stay(booking: dict):
+    """With CACHE_SYNC on, re-check a claimed stay against the database, or raise 409.
+    
+    Another worker's booking may not have reached this worker's index yet.
+    Handlers confirm before writing, and again after, since a booking another
+    worker stored in between was not visible to the first check; a stay that
+    fails the second check is withdrawn, so of two racing bookings at most one stays.
+    """
+    if CACHE_SYNC:
+        conflicts = await stored_conflicts([booking])
+        if conflicts:
+            raise stay_conflict(booking, conflicts[booking["id"]])
+
+# Room availability
+class RoomCatalog:
+    """In-memory room catalog indexed by room type, sorted by max occupancy.
+    
+    Together with ``room_intervals`` it answers availability searches without
+    touching the database.
+    """
+    
+    def __init__(self):
+        self.rooms = {}  # room id -> summary
+        self.by_type = {}  # room_type -> sorted [(max_occupancy, room_number, room id)]
+        self.journal = None  # changes made while a reload reads the rooms
+    
+    def rebuild(self, rooms: list):
+        self.rooms = {}
+        self.by_type = {}
+        for room in rooms:
+            self.add(room)
+    
+    def add(self, room: dict):
+        """Index (or re-index) a room."""
+        self.remove(room["id"])
+        summary = {
+            "id": room["id"],
+            "room_number": room["room_number"],
+            "room_type": room["room_type"],
+            "max_occupancy": room.get("max_occupancy", 2),
+            "price_per_night": room.get("price_per_night", 0.0),
+        }
+        self.rooms[room["id"]] = summary
+        insort(self.by_type.setdefault(summary["room_type"], []), (summary["max_occupancy"], summary["room_number"], room["id"]))
+        if self.journal is not None:
+            self.journal.append((self.add, room))
+    
+    def remove(self, room_id: str):
+        if self.journal is not None:
+            self.journal.append((self.remove, room_id))
+        summary = self.rooms.pop(room_id, None)
+        if summary:
+            self.by_type[summary["room_type"]].remove((summary["max_occupancy"], summary["room_number"], room_id))
+    
+    def available(self, check_in: date, check_out: date, room_type: Optional[str] = None, min_occupancy: int = 1) -> list:
+        """Rooms of ``room_type`` (any type if None) for ``min_occupancy`` guests free for the stay."""
+        room_types = [room_type] if room_type else list(self.by_type)
+        matches = []
+        for current_type in room_types:
+            entries = self.by_type.get(current_type, [])
+            # Entries are sorted by occupancy, so everything from here on is large enough
+            for _, room_number, room_id in entries[bisect_left(entries, (min_occupancy,)):]:
+                if not room_intervals.find_conflict(room_number, check_in, check_out):
+                    matches.append(self.rooms[room_id])
+        matches.sort(key=lambda room: room["room_number"])
+        return matches
+
+room_catalog = RoomCatalog()
+
+async def load_room_catalog():
+    await reload_index(room_catalog, db.rooms.find(
+        {},
+        {"_id": 0, "id": 1, "room_number": 1, "room_type": 1, "max_occupancy": 1, "price_per_night": 1}
+    ))
+
+# Room Management Routes
+@api_router.get("/rooms", response_model=List[Room], dependencies=[conditional("rooms")])
+async def get_rooms(response: Response, limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
+    return await list_page(Room, db.rooms, {}, "created_at", 1, limit, after, response, fields)
+
+@api_router.get("/rooms/availability", dependencies=[conditional("rooms", "bookings")])
+async def get_room_availability(check_in: date, check_out: date, room_type: Optional[str] = None, min_occupancy: int = Query(1, ge=1)):
+    # Answered from the in-memory room catalog and booking interval index
+    if check_out < check_in:
+        raise HTTPException(status_code=400, detail="check_out must not be before check_in")
+    return room_catalog.available(check_in, check_out, room_type, min_occupancy)
 
 @api_router.post("/rooms", response_model=Room)
 async def create_room(room: RoomCreate):
     room_dict = room.dict()
     room_obj = Room(**room_dict, status="Available")
-    await db.rooms.insert_one(room_obj.dict())
+    try:
+        await db.rooms.insert_one(room_obj.dict())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Room number already exists")
+    room_catalog.add(room_obj.dict())
+    # Monthly occupancy depends on the room count
+    report_cache.invalidate_endpoint(*ROOM_COUNT_REPORTS)
+    record_change("rooms", "insert", room_obj.id, room_obj.dict())
     return room_obj
 
 @api_router.put("/rooms/{room_id}")
 async def update_room(room_id: str, room: RoomCreate):
     room_dict = room.dict()
-    result = await db.rooms.update_one({"id": room_id}, {"$set": room_dict})
+    try:
+        result = await db.rooms.update_one({"id": room_id}, {"$set": room_dict})
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Room number already exists")
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Room not found")
+    room_catalog.add({"id": room_id, **room_dict})
+    record_change("rooms", "update", room_id, room_dict)
     return {"message": "Room updated successfully"}
 
 @api_router.delete("/rooms/{room_id}")
@@ -193,6 +1340,9 @@ async def delete_room(room_id: str):
     result = await db.rooms.delete_one({"id": room_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Room not found")
+    room_catalog.remove(room_id)
+    report_cache.invalidate_endpoint(*ROOM_COUNT_REPORTS)
+    record_change("rooms", "delete", room_id)
     return {"message": "Room deleted successfully"}
 
 @api_router.put("/rooms/{room_id}/status")
@@ -208,41 +1358,25 @@ async def update_room_status(room_id: str, status: str, guest_name: Optional[str
     result = await db.rooms.update_one({"id": room_id}, {"$set": update_data})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Room not found")
+    record_change("rooms", "update", room_id, update_data)
     return {"message": "Room status updated successfully"}
 
 # Booking Management Routes
-@api_router.get("/bookings", response_model=List[Booking])
-async def get_bookings():
-    bookings = await db.bookings.find().to_list(1000)
-    
-    # Convert datetime back to date for response
-    for booking in bookings:
-        if isinstance(booking.get('check_in_date'), datetime):
-            booking['check_in_date'] = booking['check_in_date'].date()
-        if isinstance(booking.get('check_out_date'), datetime):
-            booking['check_out_date'] = booking['check_out_date'].date()
-    
-    return [Booking(**booking) for booking in bookings]
+@api_router.get("/bookings", response_model=List[Booking], dependencies=[conditional("bookings")])
+async def get_bookings(response: Response, limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
+    return await list_page(Booking, db.bookings, {}, "created_at", 1, limit, after, response, fields)
 
-@api_router.get("/bookings/upcoming", response_model=List[Booking])
+@api_router.get("/bookings/upcoming", response_model=List[Booking], dependencies=[conditional("bookings", daily=True)])
 async def get_upcoming_bookings():
-    today = datetime.combine(datetime.now().date(), datetime.min.time())
     bookings = await db.bookings.find({
         "status": "Upcoming",
-        "check_in_date": {"$gte": today}
+        "check_in_date": {"$gte": date.today()}
     }).sort("check_in_date", 1).to_list(10)
     
-    # Convert datetime back to date for response
-    for booking in bookings:
-        if isinstance(booking.get('check_in_date'), datetime):
-            booking['check_in_date'] = booking['check_in_date'].date()
-        if isinstance(booking.get('check_out_date'), datetime):
-            booking['check_out_date'] = booking['check_out_date'].date()
-    
     return [Booking(**booking) for booking in bookings]
 
-@api_router.post("/bookings", response_model=Booking)
-async def create_booking(booking: BookingCreate):
+def new_booking(booking: BookingCreate):
+    """Build an Upcoming booking and its MongoDB storage form from a request."""
     booking_dict = booking.dict()
     
     # Convert date strings to datetime for MongoDB compatibility
@@ -258,109 +1392,248 @@ async def create_booking(booking: BookingCreate):
             booking_dict['check_out_date'] = datetime.strptime(booking_dict['check_out_date'], '%Y-%m-%d').date()
     
     booking_obj = Booking(**booking_dict, status="Upcoming")
-    
-    # Convert date objects to datetime for MongoDB storage
-    booking_storage = booking_obj.dict()
-    if booking_storage.get('check_in_date'):
-        booking_storage['check_in_date'] = datetime.combine(booking_storage['check_in_date'], datetime.min.time())
-    if booking_storage.get('check_out_date'):
-        booking_storage['check_out_date'] = datetime.combine(booking_storage['check_out_date'], datetime.min.time())
-    
-    await db.bookings.insert_one(booking_storage)
+    return booking_obj, booking_obj.dict()
+
+@api_router.post("/bookings", response_model=Booking)
+async def create_booking(booking: BookingCreate):
+    booking_obj, booking_storage = new_booking(booking)
+    
+    reserve_stay(booking_storage)
+    try:
+        await confirm_stay(booking_storage)
+        await db.bookings.insert_one(booking_storage)
+        try:
+            await confirm_stay(booking_storage)
+        except HTTPException:
+            await db.bookings.delete_one({"id": booking_storage["id"]})
+            raise
+    except Exception:
+        room_intervals.remove(booking_storage["id"])
+        raise
+    await record_guest_booking(booking_storage, None, booking_storage["status"])
+    record_change("bookings", "insert", booking_storage["id"], booking_storage)
     return booking_obj
 
+@api_router.post("/bookings/bulk")
+async def create_bookings_bulk(bookings: List[dict]):
+    # Group and tour-operator blocks: validate, conflict-check and insert a whole
+    # batch in one request, reporting the outcome of every item
+    if len(bookings) > MAX_BULK_BOOKINGS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_BOOKINGS} bookings per request")
+    
+    results = [None] * len(bookings)
+    pending = []
+    
+    # One pass checks each item against existing bookings and earlier items of the batch
+    for index, item in enumerate(bookings):
+        try:
+            booking_obj, booking_storage = new_booking(BookingCreate.model_validate(item))
+        except ValidationError as e:
+            results[index] = {"index": index, "status": "invalid", "detail": e.errors(include_url=False, include_context=False)}
+            continue
+        try:
+            reserve_stay(booking_storage)
+        except HTTPException as e:
+            results[index] = {"index": index, "status": "conflict", "detail": e.detail}
+            continue
+        pending.append((index, booking_obj, booking_storage))
+    
+    async def drop_stored_conflicts(items: list) -> list:
+        # See confirm_stay: with several workers the database has the final say
+        if not items or not CACHE_SYNC:
+            return items
+        conflicts = await stored_conflicts([booking_storage for _, _, booking_storage in items])
+        kept = []
+        for index, booking_obj, booking_storage in items:
+            if booking_storage["id"] in conflicts:
+                room_intervals.remove(booking_storage["id"])
+                results[index] = {"index": index, "status": "conflict", "detail": stay_conflict(booking_storage, conflicts[booking_storage["id"]]).detail}
+            else:
+                kept.append((index, booking_obj, booking_storage))
+        return kept
+    
+    try:
+        pending = await drop_stored_conflicts(pending)
+    except Exception:
+        for _, _, booking_storage in pending:
+            room_intervals.remove(booking_storage["id"])
+        raise
+    
+    if pending:
+        failed = {}
+        try:
+            await db.bookings.insert_many([booking_storage for _, _, booking_storage in pending], ordered=False)
+        except BulkWriteError as e:
+            failed = {error["index"]: error.get("errmsg", "Write failed") for error in e.details.get("writeErrors", [])}
+        except Exception:
+            for _, _, booking_storage in pending:
+                room_intervals.remove(booking_storage["id"])
+            raise
+        
+        inserted = []
+        for position, (index, booking_obj, booking_storage) in enumerate(pending):
+            if position in failed:
+                room_intervals.remove(booking_storage["id"])
+                results[index] = {"index": index, "status": "error", "detail": failed[position]}
+            else:
+                inserted.append((index, booking_obj, booking_storage))
+        
+        kept = await drop_stored_conflicts(inserted)
+        withdrawn = [booking_storage["id"] for index, _, booking_storage in inserted if results[index] is not None]
+        if withdrawn:
+            await db.bookings.delete_many({"id": {"$in": withdrawn}})
+        
+        for index, booking_obj, booking_storage in kept:
+            results[index] = {"index": index, "status": "created", "booking": booking_obj}
+            record_change("bookings", "insert", booking_storage["id"], booking_storage)
+        
+        # One round trip updates the profiles of every created booking
+        guest_writes = [guest_write(booking_storage, None, booking_storage["status"]) for _, _, booking_storage in kept]
+        guest_writes = [write for write in guest_writes if write]
+        if guest_writes:
+            await db.guests.bulk_write(guest_writes)
+            record_write("guests")
+    
+    created = sum(1 for result in results if result["status"] == "created")
+    return {"created": created, "failed": len(bookings) - created, "results": results}
+
 @api_router.put("/bookings/{booking_id}")
 async def update_booking(booking_id: str, booking_update: BookingUpdate):
     update_data = {}
     
     # Only update fields that are provided
     if booking_update.check_in_date is not None:
-        update_data['check_in_date'] = datetime.combine(booking_update.check_in_date, datetime.min.time())
+        update_data['check_in_date'] = booking_update.check_in_date
     if booking_update.check_out_date is not None:
-        update_data['check_out_date'] = datetime.combine(booking_update.check_out_date, datetime.min.time())
+        update_data['check_out_date'] = booking_update.check_out_date
     if booking_update.additional_notes is not None:
         update_data['additional_notes'] = booking_update.additional_notes
     
     if not update_data:
         raise HTTPException(status_code=400, detail="No fields provided for update")
     
-    result = await db.bookings.update_one({"id": booking_id}, {"$set": update_data})
-    if result.matched_count == 0:
+    booking = await db.bookings.find_one({"id": booking_id})
+    if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
     
+    # Moving an active booking must not run into another booking of the room
+    moved = 'check_in_date' in update_data or 'check_out_date' in update_data
+    if moved and booking.get("status") in ACTIVE_BOOKING_STATUSES:
+        reserve_stay({**booking, **update_data}, exclude_id=booking_id)
+    
+    try:
+        if moved and booking.get("status") in ACTIVE_BOOKING_STATUSES:
+            await confirm_stay({**booking, **update_data})
+        await db.bookings.update_one({"id": booking_id}, {"$set": update_data})
+        if moved and booking.get("status") in ACTIVE_BOOKING_STATUSES:
+            try:
+                await confirm_stay({**booking, **update_data})
+            except HTTPException:
+                await db.bookings.update_one({"id": booking_id}, {"$set": {field: booking.get(field) for field in update_data}})
+                raise
+    except Exception:
+        if moved and booking.get("status") in ACTIVE_BOOKING_STATUSES:
+            room_intervals.add(booking)
+        raise
+    
+    # Moving an occupying stay changes occupancy on both the old and new dates
+    if booking.get("status") in OCCUPYING_STATUSES:
+        invalidate_stay_reports(booking)
+        invalidate_stay_reports({**booking, **update_data})
+    
+    # A completed stay's check-out date may be its guest's last_stay
+    if booking.get("status") == "Completed" and 'check_out_date' in update_data and booking.get("guest_email"):
+        await refresh_last_stay(booking["guest_email"])
+        record_write("guests")
+    
+    record_change("bookings", "update", booking_id, update_data)
     return {"message": "Booking updated successfully"}
 
 # Customer Management Routes
-@api_router.get("/customers/checked-in", response_model=List[Customer])
-async def get_checked_in_customers():
-    customers = await db.customers.find().to_list(1000)
-    
-    # Convert datetime back to date for response
-    for customer in customers:
-        if isinstance(customer.get('check_in_date'), datetime):
-            customer['check_in_date'] = customer['check_in_date'].date()
-        if isinstance(customer.get('check_out_date'), datetime):
-            customer['check_out_date'] = customer['check_out_date'].date()
-    
-    return [Customer(**customer) for customer in customers]
+@api_router.get("/customers/checked-in", response_model=List[Customer], dependencies=[conditional("customers")])
+async def get_checked_in_customers(response: Response, limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
+    return await list_page(Customer, db.customers, {}, "created_at", 1, limit, after, response, fields)
 
 @api_router.post("/customers", response_model=Customer)
 async def create_customer(customer: Customer):
     await db.customers.insert_one(customer.dict())
+    record_change("customers", "insert", customer.id, customer.dict())
     return customer
 
 @api_router.post("/checkout")
 async def checkout_customer(checkout: CheckoutRequest):
-    # Find customer first to get room info
-    customer = await db.customers.find_one({"id": checkout.customer_id})
-    if not customer:
-        raise HTTPException(status_code=404, detail="Customer not found")
-    
-    # Calculate total amount
-    base_room_charges = customer.get('room_charges', 500.0)  # Default room charge
-    advance_amount = customer.get('advance_amount', 0.0)
-    additional_amount = checkout.additional_amount
-    discount_amount = checkout.discount_amount
-    total_amount = base_room_charges + additional_amount - advance_amount - discount_amount
-    
-    # Create daily sales record
-    daily_sale = DailySale(
-        date=datetime.now().date(),
-        customer_name=customer.get('name', ''),
-        room_number=customer.get('current_room', ''),
-        room_charges=base_room_charges,
-        additional_charges=additional_amount,
-        discount_amount=discount_amount,
-        advance_amount=advance_amount,
-        total_amount=total_amount,
-        payment_method=checkout.payment_method
-    )
-    
-    # Store the daily sale record
-    daily_sale_dict = daily_sale.dict()
-    daily_sale_dict['date'] = datetime.combine(daily_sale_dict['date'], datetime.min.time())
-    await db.daily_sales.insert_one(daily_sale_dict)
-    
-    # Update customer with final billing details
-    await db.customers.update_one(
-        {"id": checkout.customer_id},
-        {"$set": {
-            "additional_charges": additional_amount,
-            "discount_amount": discount_amount,
-            "total_amount": total_amount
-        }}
-    )
-    
-    # Remove customer from checked-in list
-    result = await db.customers.delete_one({"id": checkout.customer_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Customer not found")
+    async with write_set() as writes:
+        # Remove customer from checked-in list, keeping the record for billing
+        customer = await db.customers.find_one_and_delete({"id": checkout.customer_id}, session=writes.session)
+        if not customer:
+            raise HTTPException(status_code=404, detail="Customer not found")
+        writes.on_rollback(lambda: db.customers.insert_one(customer))
+        
+        # Update room status to available; the previous state gives the room type
+        # to snapshot onto the sale
+        vacated = {"status": "Available", "current_guest": None, "check_in_date": None, "check_out_date": None}
+        room = await db.rooms.find_one_and_update(
+            {"room_number": customer.get('current_room', '')},
+            {"$set": vacated},
+            projection={"_id": 0, "id": 1, "room_type": 1, "status": 1, "current_guest": 1, "check_in_date": 1, "check_out_date": 1},
+            session=writes.session
+        )
+        if room:
+            writes.on_rollback(lambda: db.rooms.update_one(
+                {"room_number": customer["current_room"], "status": "Available"},
+                {"$set": {field: room.get(field) for field in ("status", "current_guest", "check_in_date", "check_out_date")}}
+            ))
+        
+        # Calculate total amount
+        base_room_charges = customer.get('room_charges', 500.0)  # Default room charge
+        advance_amount = customer.get('advance_amount', 0.0)
+        additional_amount = checkout.additional_amount
+        discount_amount = checkout.discount_amount
+        total_amount = base_room_charges + additional_amount - advance_amount - discount_amount
+        
+        # Create daily sales record
+        daily_sale = DailySale(
+            date=datetime.now().date(),
+            customer_name=customer.get('name', ''),
+            room_number=customer.get('current_room', ''),
+            room_charges=base_room_charges,
+            additional_charges=additional_amount,
+            discount_amount=discount_amount,
+            advance_amount=advance_amount,
+            total_amount=total_amount,
+            payment_method=checkout.payment_method,
+            room_type=room.get('room_type', '') if room else ''
+        )
+        
+        # Store the daily sale record
+        daily_sale_dict = daily_sale.dict()
+        await db.daily_sales.insert_one(daily_sale_dict, session=writes.session)
+        writes.on_rollback(lambda: db.daily_sales.delete_one({"id": daily_sale.id}))
+        await record_in_ledger("daily_sales", daily_sale_dict, session=writes.session)
+        writes.on_rollback(lambda: record_in_ledger("daily_sales", daily_sale_dict, sign=-1))
+        
+        # Mark the stay's booking completed
+        if customer.get("booking_id"):
+            booking_filter = {"id": customer["booking_id"], "status": "Checked-in"}
+        else:
+            booking_filter = {"room_number": customer.get('current_room', ''), "status": "Checked-in"}
+        booking = await db.bookings.find_one_and_update(
+            booking_filter,
+            {"$set": {"status": "Completed"}},
+            projection={"_id": 0, "id": 1, "guest_email": 1, "check_in_date": 1, "check_out_date": 1},
+            session=writes.session
+        )
     
-    # Update room status to available
-    await db.rooms.update_one(
-        {"room_number": customer["current_room"]},
-        {"$set": {"status": "Available", "current_guest": None, "check_in_date": None, "check_out_date": None}}
-    )
+    # The stay no longer holds its room; refresh reports once the sale is committed
+    if booking:
+        room_intervals.remove(booking["id"])
+        await record_guest_booking(booking, "Checked-in", "Completed")
+        record_change("bookings", "update", booking["id"], {"status": "Completed"})
+    report_cache.invalidate(daily_sale.date)
+    record_write("daily_sales")
+    record_change("customers", "delete", customer["id"])
+    if room:
+        record_change("rooms", "update", room["id"], vacated)
     
     return {
         "message": "Customer checked out successfully",
@@ -376,58 +1649,72 @@ async def checkout_customer(checkout: CheckoutRequest):
 
 @api_router.post("/checkin")
 async def checkin_customer(checkin: CheckinRequest):
-    # Find the booking
-    booking = await db.bookings.find_one({"id": checkin.booking_id})
-    if not booking:
-        raise HTTPException(status_code=404, detail="Booking not found")
-    
-    # Check if room is available
-    room = await db.rooms.find_one({"room_number": booking["room_number"]})
-    if not room:
-        raise HTTPException(status_code=404, detail="Room not found")
-    
-    if room["status"] != "Available":
-        raise HTTPException(status_code=400, detail="Room is not available for check-in")
-    
-    # Use the booking amount as room charges (actual amount customer agreed to pay)
-    room_charges = booking.get("booking_amount", 500.0)
-    
-    # Create customer record
-    customer = Customer(
-        name=booking["guest_name"],
-        email=booking["guest_email"],
-        phone=booking["guest_phone"],
-        current_room=booking["room_number"],
-        check_in_date=booking["check_in_date"] if isinstance(booking["check_in_date"], date) else booking["check_in_date"].date(),
-        check_out_date=booking["check_out_date"] if isinstance(booking["check_out_date"], date) else booking["check_out_date"].date(),
-        advance_amount=checkin.advance_amount,
-        notes=checkin.notes,
-        room_charges=room_charges,
-        total_amount=room_charges - checkin.advance_amount
-    )
-    
-    # Add customer to checked-in list
-    customer_dict = customer.dict()
-    customer_dict['check_in_date'] = datetime.combine(customer_dict['check_in_date'], datetime.min.time())
-    customer_dict['check_out_date'] = datetime.combine(customer_dict['check_out_date'], datetime.min.time())
-    await db.customers.insert_one(customer_dict)
-    
-    # Update room status to occupied
-    await db.rooms.update_one(
-        {"room_number": booking["room_number"]},
-        {"$set": {
+    async with write_set() as writes:
+        # Claim the booking: only an upcoming booking can be checked in, and only once
+        booking = await db.bookings.find_one_and_update(
+            {"id": checkin.booking_id, "status": "Upcoming"},
+            {"$set": {"status": "Checked-in"}},
+            session=writes.session
+        )
+        if not booking:
+            if not await db.bookings.find_one({"id": checkin.booking_id}, {"_id": 1}, session=writes.session):
+                raise HTTPException(status_code=404, detail="Booking not found")
+            raise HTTPException(status_code=400, detail="Booking is not upcoming")
+        writes.on_rollback(lambda: db.bookings.update_one(
+            {"id": checkin.booking_id, "status": "Checked-in"},
+            {"$set": {"status": booking["status"]}}
+        ))
+        
+        # Occupy the room only if it is still available; the status filter makes
+        # the check and the update a single atomic operation
+        occupied = {
             "status": "Occupied",
             "current_guest": booking["guest_name"],
-            "check_in_date": datetime.combine(booking["check_in_date"] if isinstance(booking["check_in_date"], date) else booking["check_in_date"].date(), datetime.min.time()),
-            "check_out_date": datetime.combine(booking["check_out_date"] if isinstance(booking["check_out_date"], date) else booking["check_out_date"].date(), datetime.min.time())
-        }}
-    )
+            "check_in_date": booking["check_in_date"],
+            "check_out_date": booking["check_out_date"]
+        }
+        room = await db.rooms.find_one_and_update(
+            {"room_number": booking["room_number"], "status": "Available"},
+            {"$set": occupied},
+            session=writes.session
+        )
+        if not room:
+            if not await db.rooms.find_one({"room_number": booking["room_number"]}, {"_id": 1}, session=writes.session):
+                raise HTTPException(status_code=404, detail="Room not found")
+            raise HTTPException(status_code=400, detail="Room is not available for check-in")
+        writes.on_rollback(lambda: db.rooms.update_one(
+            {"room_number": booking["room_number"], "status": "Occupied"},
+            {"$set": {field: room.get(field) for field in ("status", "current_guest", "check_in_date", "check_out_date")}}
+        ))
+        
+        # Use the booking amount as room charges (actual amount customer agreed to pay)
+        room_charges = booking.get("booking_amount", 500.0)
+        
+        # Create customer record
+        customer = Customer(
+            name=booking["guest_name"],
+            email=booking["guest_email"],
+            phone=booking["guest_phone"],
+            current_room=booking["room_number"],
+            booking_id=booking["id"],
+            check_in_date=booking["check_in_date"],
+            check_out_date=booking["check_out_date"],
+            advance_amount=checkin.advance_amount,
+            notes=checkin.notes,
+            room_charges=room_charges,
+            total_amount=room_charges - checkin.advance_amount
+        )
+        
+        # Add customer to checked-in list
+        customer_dict = customer.dict()
+        await db.customers.insert_one(customer_dict, session=writes.session)
     
-    # Update booking status to checked-in
-    await db.bookings.update_one(
-        {"id": checkin.booking_id},
-        {"$set": {"status": "Checked-in"}}
-    )
+    room_intervals.add(booking)
+    invalidate_stay_reports(booking)
+    await record_guest_booking(booking, "Upcoming", "Checked-in")
+    record_change("bookings", "update", booking["id"], {"status": "Checked-in"})
+    record_change("rooms", "update", room["id"], occupied)
+    record_change("customers", "insert", customer.id, customer_dict)
     
     return {"message": "Customer checked in successfully", "customer": customer}
 
@@ -446,13 +1733,22 @@ async def cancel_booking(booking_id: str):
     
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Booking not found")
+    room_intervals.remove(booking_id)
+    await record_guest_booking(booking, booking["status"], "Cancelled")
+    record_change("bookings", "update", booking_id, {"status": "Cancelled"})
     
     # If room was reserved for this booking, make it available
     if booking["status"] == "Upcoming":
-        await db.rooms.update_one(
+        released = {"status": "Available", "current_guest": None, "check_in_date": None, "check_out_date": None}
+        room = await db.rooms.find_one_and_update(
             {"room_number": booking["room_number"], "status": "Reserved"},
-            {"$set": {"status": "Available", "current_guest": None, "check_in_date": None, "check_out_date": None}}
+            {"$set": released},
+            projection={"_id": 0, "id": 1}
         )
+        if room:
+            record_change("rooms", "update", room["id"], released)
+    elif booking["status"] in OCCUPYING_STATUSES:
+        invalidate_stay_reports(booking)
     
     return {"message": "Booking cancelled successfully"}
 
@@ -480,12 +1776,9 @@ async def initialize_sample_data():
     
     for room in sample_rooms:
         room_dict = room.dict()
-        # Convert date objects to datetime for MongoDB compatibility
-        if room_dict.get('check_in_date'):
-            room_dict['check_in_date'] = datetime.combine(room_dict['check_in_date'], datetime.min.time())
-        if room_dict.get('check_out_date'):
-            room_dict['check_out_date'] = datetime.combine(room_dict['check_out_date'], datetime.min.time())
         await db.rooms.insert_one(room_dict)
+        room_catalog.add(room_dict)
+    report_cache.invalidate_endpoint(*ROOM_COUNT_REPORTS)
     
     # Create sample bookings
     sample_bookings = [
@@ -505,10 +1798,9 @@ async def initialize_sample_data():
     
     for booking in sample_bookings:
         booking_dict = booking.dict()
-        # Convert date objects to datetime for MongoDB compatibility
-        booking_dict['check_in_date'] = datetime.combine(booking_dict['check_in_date'], datetime.min.time())
-        booking_dict['check_out_date'] = datetime.combine(booking_dict['check_out_date'], datetime.min.time())
         await db.bookings.insert_one(booking_dict)
+        room_intervals.add(booking_dict)
+        await record_guest_booking(booking_dict, None, booking_dict["status"])
     
     # Create sample checked-in customers
     sample_customers = [
@@ -521,11 +1813,7 @@ async def initialize_sample_data():
     ]
     
     for customer in sample_customers:
-        customer_dict = customer.dict()
-        # Convert date objects to datetime for MongoDB compatibility
-        customer_dict['check_in_date'] = datetime.combine(customer_dict['check_in_date'], datetime.min.time())
-        customer_dict['check_out_date'] = datetime.combine(customer_dict['check_out_date'], datetime.min.time())
-        await db.customers.insert_one(customer_dict)
+        await db.customers.insert_one(customer.dict())
     
     # Create sample expenses
     sample_expenses = [
@@ -540,80 +1828,168 @@ async def initialize_sample_data():
     
     for expense in sample_expenses:
         expense_dict = expense.dict()
-        # Convert date to datetime for MongoDB compatibility
-        expense_dict['expense_date'] = datetime.combine(expense_dict['expense_date'], datetime.min.time())
         await db.expenses.insert_one(expense_dict)
+        await record_in_ledger("expenses", expense_dict)
     
+    record_write(*EVENT_COLLECTIONS, "expenses", "guests")
+    events.resync()
     return {"message": "Sample data initialized successfully"}
 
 # Guest Management Routes
-@api_router.get("/guests")
-async def get_guests():
-    # Get all bookings to extract guest information
-    bookings = await db.bookings.find().to_list(1000)
-    
-    # Create a dictionary to store unique guests with their booking history
-    guests_dict = {}
-    
-    for booking in bookings:
-        guest_email = booking.get('guest_email')
-        if guest_email:
-            if guest_email not in guests_dict:
-                # Convert datetime back to date for response
-                check_in_date = booking.get('check_in_date')
-                check_out_date = booking.get('check_out_date')
-                if isinstance(check_in_date, datetime):
-                    check_in_date = check_in_date.date()
-                if isinstance(check_out_date, datetime):
-                    check_out_date = check_out_date.date()
-                
-                guests_dict[guest_email] = {
-                    'id': guest_email,  # Using email as unique identifier
-                    'name': booking.get('guest_name'),
-                    'email': guest_email,
-                    'phone': booking.get('guest_phone'),
-                    'total_bookings': 0,
-                    'total_stays': 0,
-                    'last_stay': None,
-                    'upcoming_bookings': 0,
-                    'bookings': []
-                }
-            
-            # Add booking to guest's history
-            check_in_date = booking.get('check_in_date')
-            check_out_date = booking.get('check_out_date')
-            if isinstance(check_in_date, datetime):
-                check_in_date = check_in_date.date()
-            if isinstance(check_out_date, datetime):
-                check_out_date = check_out_date.date()
-            
-            booking_info = {
-                'id': booking.get('id'),
-                'room_number': booking.get('room_number'),
-                'check_in_date': check_in_date,
-                'check_out_date': check_out_date,
-                'status': booking.get('status'),
-                'created_at': booking.get('created_at')
-            }
-            
-            guests_dict[guest_email]['bookings'].append(booking_info)
-            guests_dict[guest_email]['total_bookings'] += 1
-            
-            # Update stats based on booking status
-            if booking.get('status') == 'Completed':
-                guests_dict[guest_email]['total_stays'] += 1
-                if not guests_dict[guest_email]['last_stay'] or check_out_date > guests_dict[guest_email]['last_stay']:
-                    guests_dict[guest_email]['last_stay'] = check_out_date
-            elif booking.get('status') == 'Upcoming':
-                guests_dict[guest_email]['upcoming_bookings'] += 1
-    
-    # Convert dictionary to list and sort by name
-    guests_list = list(guests_dict.values())
-    guests_list.sort(key=lambda x: x['name'])
-    
-    return guests_list
+# One profile per guest email in ``guests``, kept current incrementally by every
+# handler that creates a booking or changes its status.
+GUEST_SEARCH_FIELDS = ["guest_name", "guest_email", "guest_phone", "guest_id_passport"]
+MAX_GUEST_SEARCH_RESULTS = 50
+
+def search_key(text: str) -> str:
+    """Normalize text for typeahead matching: casefolded letters and digits in any script."""
+    return re.sub(r"[\W_]", "", text.casefold())
+
+def guest_search_keys(booking: dict) -> List[str]:
+    """The typeahead keys a booking contributes to its guest's profile.
+    
+    Every word of the name, the whole name, the email and its local part, the
+    passport number and every suffix of the phone digits are stored normalized,
+    so a prefix of any of them (or any run of phone digits) finds the guest with
+    an anchored regex on the search_keys index.
+    """
+    keys = set()
+    for field in GUEST_SEARCH_FIELDS:
+        value = booking.get(field) or ""
+        keys.add(search_key(value))
+        if field == "guest_name":
+            keys.update(search_key(word) for word in value.split())
+        elif field == "guest_email":
+            keys.add(search_key(value.split("@")[0]))
+        elif field == "guest_phone":
+            digits = search_key(value)
+            keys.update(digits[start:] for start in range(len(digits) - 3))
+    keys.discard("")
+    return sorted(keys)
+
+def guest_update(booking: dict, old_status: Optional[str], new_status: str) -> dict:
+    """Build the profile update for a booking moving from ``old_status`` to ``new_status``.
+    
+    ``old_status`` is None for a newly created booking.
+    """
+    inc = {}
+    if old_status is None:
+        inc["total_bookings"] = 1
+    if old_status == "Upcoming":
+        inc["upcoming_bookings"] = inc.get("upcoming_bookings", 0) - 1
+    if new_status == "Upcoming":
+        inc["upcoming_bookings"] = inc.get("upcoming_bookings", 0) + 1
+    if new_status == "Completed" and old_status != "Completed":
+        inc["total_stays"] = 1
+    if old_status == "Completed" and new_status != "Completed":
+        # last_stay is recomputed by record_guest_booking
+        inc["total_stays"] = -1
+    
+    update = {}
+    inc = {field: amount for field, amount in inc.items() if amount}
+    if inc:
+        update["$inc"] = inc
+    if new_status == "Completed":
+        update["$max"] = {"last_stay": ledger_day(booking["check_out_date"])}
+    if old_status is None:
+        # Like the booking history it replaces, the first booking names the guest
+        update["$setOnInsert"] = {
+            "email": booking["guest_email"],
+            "name": booking.get("guest_name"),
+            "phone": booking.get("guest_phone")
+        }
+        update["$addToSet"] = {"search_keys": {"$each": guest_search_keys(booking)}}
+    return update
+
+def guest_write(booking: dict, old_status: Optional[str], new_status: str) -> Optional[UpdateOne]:
+    """The guests collection write for a booking status change, if any."""
+    if not booking.get("guest_email"):
+        return None
+    update = guest_update(booking, old_status, new_status)
+    if not update:
+        return None
+    # Profiles are keyed by email in ``id``: the unique index serves the lookup, and
+    # the server retries an upsert that loses a race to insert the same guest
+    return UpdateOne({"id": booking["guest_email"]}, update, upsert=old_status is None)
+
+async def record_guest_booking(booking: dict, old_status: Optional[str], new_status: str):
+    write = guest_write(booking, old_status, new_status)
+    if write:
+        await db.guests.bulk_write([write])
+        if old_status == "Completed" and new_status != "Completed":
+            # $max can't take a stay back; the latest remaining one is looked up
+            await refresh_last_stay(booking["guest_email"])
+        record_write("guests")
+
+async def refresh_last_stay(email: str):
+    """Set a guest's last_stay from their latest Completed booking."""
+    latest = await db.bookings.find(
+        {"guest_email": email, "status": "Completed"},
+        {"_id": 0, "check_out_date": 1}
+    ).sort("check_out_date", -1).limit(1).to_list(1)
+    await db.guests.update_one(
+        {"id": email},
+        {"$set": {"last_stay": latest[0]["check_out_date"] if latest else None}}
+    )
+
+async def rebuild_guests() -> int:
+    """Recompute every guest profile from the bookings collection."""
+    pipeline = [
+        {"$match": {"guest_email": {"$nin": [None, ""]}}},
+        {"$sort": {"_id": 1}},
+        {"$group": {
+            "_id": "$guest_email",
+            "name": {"$first": "$guest_name"},
+            "phone": {"$first": "$guest_phone"},
+            "total_bookings": {"$sum": 1},
+            "total_stays": {"$sum": {"$cond": [{"$eq": ["$status", "Completed"]}, 1, 0]}},
+            "upcoming_bookings": {"$sum": {"$cond": [{"$eq": ["$status", "Upcoming"]}, 1, 0]}},
+            "last_stay": {"$max": {"$cond": [{"$eq": ["$status", "Completed"]}, "$check_out_date", None]}},
+            "identities": {"$addToSet": {field: f"${field}" for field in GUEST_SEARCH_FIELDS}}
+        }}
+    ]
+    guests = []
+    async for row in db.bookings.aggregate(pipeline):
+        email = row.pop("_id")
+        search_keys = set()
+        for identity in row.pop("identities"):
+            search_keys.update(guest_search_keys(identity))
+        guests.append({"id": email, "email": email, **row, "search_keys": sorted(search_keys)})
+    await replace_collection("guests", guests)
+    record_write("guests", announce=True)
+    return len(guests)
+
+GUEST_PROJECTION = {"_id": 0, "search_keys": 0}
+
+def guest_profile(guest: dict) -> dict:
+    return {
+        'id': guest['id'],
+        'name': guest.get('name'),
+        'email': guest['email'],
+        'phone': guest.get('phone'),
+        'total_bookings': guest.get('total_bookings', 0),
+        'total_stays': guest.get('total_stays', 0),
+        'last_stay': guest['last_stay'].date() if guest.get('last_stay') else None,
+        'upcoming_bookings': guest.get('upcoming_bookings', 0)
+    }
+
+@api_router.get("/guests", dependencies=[conditional("guests")])
+async def get_guests(response: Response, limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None):
+    # Guest profiles sorted by name, one indexed read per page
+    guests = await fetch_page(db.guests, {}, "name", 1, limit, after, response, projection=GUEST_PROJECTION)
+    return [guest_profile(guest) for guest in guests]
+
+@api_router.get("/guests/search", dependencies=[conditional("guests")])
+async def search_guests(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=MAX_GUEST_SEARCH_RESULTS)):
+    # Front-desk typeahead over name, email, phone and passport prefixes
+    key = search_key(q)
+    if not key:
+        return []
+    query = {"search_keys": {"$regex": f"^{re.escape(key)}"}}
+    guests = await db.guests.find(query, GUEST_PROJECTION).sort([("name", 1), ("id", 1)]).limit(limit).to_list(limit)
+    return [guest_profile(guest) for guest in guests]
 
-@api_router.get("/guests/{guest_email}")
+@api_router.get("/guests/{guest_email}", dependencies=[conditional("bookings")])
 async def get_guest_details(guest_email: str):
     # Get all bookings for this guest
     bookings = await db.bookings.find({"guest_email": guest_email}).to_list(1000)
@@ -621,13 +1997,6 @@ async def get_guest_details(guest_email: str):
     if not bookings:
         raise HTTPException(status_code=404, detail="Guest not found")
     
-    # Convert datetime back to date for response
-    for booking in bookings:
-        if isinstance(booking.get('check_in_date'), datetime):
-            booking['check_in_date'] = booking['check_in_date'].date()
-        if isinstance(booking.get('check_out_date'), datetime):
-            booking['check_out_date'] = booking['check_out_date'].date()
-    
     guest_info = {
         'name': bookings[0].get('guest_name'),
         'email': guest_email,
@@ -638,6 +2007,138 @@ async def get_guest_details(guest_email: str):
     return guest_info
 
 # Reports and Analytics Routes
+async def gather_bounded(*awaitables, limit: Optional[int] = None):
+    """Await independent queries concurrently, at most ``limit`` at a time.
+    
+    Results come back in argument order, like ``asyncio.gather``. The limit
+    defaults to ``REPORT_QUERY_CONCURRENCY`` so one report can't monopolize
+    the connection pool.
+    """
+    semaphore = asyncio.Semaphore(limit or REPORT_QUERY_CONCURRENCY)
+    
+    async def run(awaitable):
+        async with semaphore:
+            return await awaitable
+    
+    return await asyncio.gather(*(run(awaitable) for awaitable in awaitables))
+
+# Room-night occupancy engine
+# Bookings that actually occupied (or occupy) their room
+OCCUPYING_STATUSES = ["Checked-in", "Completed"]
+
+def stay_nights(check_in: date, check_out: date):
+    """Return the half-open [first night, day after the last night) of a stay.
+    
+    Short Time stays check in and out on the same day and occupy that one day.
+    """
+    if check_out <= check_in:
+        check_out = check_in + timedelta(days=1)
+    return check_in, check_out
+
+async def fetch_stays(start: date, end: date):
+    """Load the check-in/check-out dates of every occupying stay overlapping start..end."""
+    return await db.bookings.find(
+        {
+            "status": {"$in": OCCUPYING_STATUSES},
+            "check_in_date": {"$lte": end},
+            "check_out_date": {"$gte": start}
+        },
+        {"_id": 0, "check_in_date": 1, "check_out_date": 1}
+    ).to_list(None)
+
+def occupied_rooms_per_day(stays: list, start: date, end: date) -> np.ndarray:
+    """Count occupied rooms on every day of start..end with a difference array.
+    
+    Each stay adds +1 on its first night and -1 the day after its last night;
+    a cumulative sum over the date axis turns that into per-day room counts.
+    """
+    days = (end - start).days + 1
+    if not stays:
+        return np.zeros(days, dtype=np.int64)
+    
+    origin = np.datetime64(start, 'D')
+    check_ins = np.array([stay["check_in_date"] for stay in stays], dtype='datetime64[D]')
+    check_outs = np.array([stay["check_out_date"] for stay in stays], dtype='datetime64[D]')
+    # Same-day (Short Time) stays still occupy their day
+    check_outs = np.maximum(check_outs, check_ins + 1)
+    
+    first = np.clip((check_ins - origin).astype(np.int64), 0, days)
+    after_last = np.clip((check_outs - origin).astype(np.int64), 0, days)
+    
+    diff = np.zeros(days + 1, dtype=np.int64)
+    np.add.at(diff, first, 1)
+    np.add.at(diff, after_last, -1)
+    return np.cumsum(diff[:-1])
+
+def occupancy_buckets(occupied: np.ndarray, start: date, granularity: str) -> list:
+    """Split per-day counts into day, week (Monday-based) or month buckets.
+    
+    Returns (first day, last day, room nights) for each bucket.
+    """
+    dates = np.arange(np.datetime64(start, 'D'), np.datetime64(start, 'D') + len(occupied))
+    if granularity == "day":
+        boundaries = np.arange(len(occupied))
+    elif granularity == "week":
+        # 1970-01-01 was a Thursday, so Mondays are where (days + 3) % 7 == 0
+        boundaries = np.flatnonzero((dates.astype(np.int64) + 3) % 7 == 0)
+    else:
+        boundaries = np.flatnonzero(dates.astype('datetime64[M]') != (dates - 1).astype('datetime64[M]'))
+    boundaries = np.union1d([0], boundaries)
+    
+    room_nights = np.add.reduceat(occupied, boundaries)
+    ends = np.append(boundaries[1:], len(occupied)) - 1
+    return [
+        (dates[first].item(), dates[last].item(), int(nights))
+        for first, last, nights in zip(boundaries, ends, room_nights)
+    ]
+
+def invalidate_stay_reports(booking: dict):
+    """Drop cached reports covering a stay whose occupancy changed."""
+    check_in = as_date(booking["check_in_date"])
+    check_out = as_date(booking["check_out_date"])
+    report_cache.invalidate(check_in, max(check_in, check_out))
+
+@api_router.get("/reports/occupancy")
+async def get_occupancy_report(start_date: Optional[str] = None, end_date: Optional[str] = None, granularity: str = "day"):
+    if granularity not in ("day", "week", "month"):
+        raise HTTPException(status_code=400, detail="Granularity must be day, week or month")
+    
+    # Default to last 30 days if no dates provided
+    if not start_date or not end_date:
+        end_date_obj = datetime.now().date()
+        start_date_obj = end_date_obj - timedelta(days=30)
+    else:
+        start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
+    if end_date_obj < start_date_obj:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    
+    cache_key = ("reports/occupancy", start_date_obj, end_date_obj, granularity)
+    cached = report_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = report_cache.generation
+    
+    total_rooms, stays = await gather_bounded(
+        db.rooms.count_documents({}),
+        fetch_stays(start_date_obj, end_date_obj)
+    )
+    occupied = occupied_rooms_per_day(stays, start_date_obj, end_date_obj)
+    
+    occupancy_data = []
+    for first, last, room_nights in occupancy_buckets(occupied, start_date_obj, granularity):
+        available_room_nights = total_rooms * ((last - first).days + 1)
+        occupancy_data.append({
+            "period_start": first.strftime('%Y-%m-%d'),
+            "period_end": last.strftime('%Y-%m-%d'),
+            "room_nights": room_nights,
+            "available_room_nights": available_room_nights,
+            "occupancy_rate": round(room_nights / available_room_nights * 100, 2) if available_room_nights else 0
+        })
+    
+    report_cache.put(cache_key, occupancy_data, generation)
+    return occupancy_data
+
 @api_router.get("/reports/daily")
 async def get_daily_reports(start_date: Optional[str] = None, end_date: Optional[str] = None):
     # Default to last 30 days if no dates provided
@@ -648,43 +2149,32 @@ async def get_daily_reports(start_date: Optional[str] = None, end_date: Optional
         start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
         end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
     
+    cache_key = ("reports/daily", start_date_obj, end_date_obj)
+    cached = report_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = report_cache.generation
+    
+    start_datetime = datetime.combine(start_date_obj, datetime.min.time())
+    end_datetime = datetime.combine(end_date_obj, datetime.max.time())
+    
+    # One ledger document per day that had any activity, rounded like period totals
+    ledger = {entry["date"].date(): sum_ledger([entry]) for entry in await read_ledger(start_datetime, end_datetime, breakdowns=False)}
+    
+    # Fill in every day of the range, including days without any records
     daily_data = []
     current_date = start_date_obj
     
     while current_date <= end_date_obj:
-        start_datetime = datetime.combine(current_date, datetime.min.time())
-        end_datetime = datetime.combine(current_date, datetime.max.time())
-        
-        # Calculate daily revenue from actual daily sales (payment collected)
-        room_revenue = 0
-        daily_sales = await db.daily_sales.find({
-            "date": {"$gte": start_datetime, "$lte": end_datetime}
-        }).to_list(1000)
-        
-        for sale in daily_sales:
-            room_revenue += sale.get("total_amount", 0)
-        
-        # Calculate additional income (non-room income)
-        additional_income = 0
-        incomes = await db.incomes.find({
-            "income_date": {"$gte": start_datetime, "$lte": end_datetime}
-        }).to_list(1000)
-        
-        for income in incomes:
-            additional_income += income.get("amount", 0)
+        entry = ledger.get(current_date, {})
         
+        # Room revenue from actual daily sales (payment collected)
+        room_revenue = entry.get("room_revenue", 0)
+        # Additional income (non-room income)
+        additional_income = entry.get("additional_income", 0)
         # Total daily revenue = room revenue + additional income
         daily_revenue = room_revenue + additional_income
-        
-        # Calculate daily expenses
-        daily_expenses = 0
-        expenses = await db.expenses.find({
-            "expense_date": {"$gte": start_datetime, "$lte": end_datetime}
-        }).to_list(1000)
-        
-        for expense in expenses:
-            daily_expenses += expense.get("amount", 0)
-        
+        daily_expenses = entry.get("expenses", 0)
         daily_profit = daily_revenue - daily_expenses
         
         daily_data.append({
@@ -694,12 +2184,13 @@ async def get_daily_reports(start_date: Optional[str] = None, end_date: Optional
             "additional_income": additional_income,
             "expenses": daily_expenses,
             "profit": daily_profit,
-            "sales_count": len(daily_sales),
-            "expenses_count": len(expenses)
+            "sales_count": entry.get("sales_count", 0),
+            "expenses_count": entry.get("expenses_count", 0)
         })
         
         current_date += timedelta(days=1)
     
+    report_cache.put(cache_key, daily_data, generation)
     return daily_data
 
 @api_router.get("/reports/monthly")
@@ -707,6 +2198,44 @@ async def get_monthly_reports(year: Optional[int] = None):
     if not year:
         year = datetime.now().year
     
+    cache_key = ("reports/monthly", date(year, 1, 1), date(year, 12, 31))
+    cached = report_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = report_cache.generation
+    
+    year_start = datetime(year, 1, 1)
+    next_year_start = datetime(year + 1, 1, 1)
+    
+    # All twelve months of ledger totals in one round-trip, summed per month on the server
+    pipeline = [
+        {"$match": {"date": {"$gte": year_start, "$lt": next_year_start}}},
+        {"$project": {
+            "_id": 0,
+            "on": "$date",
+            "revenue": "$room_revenue",
+            "sales_count": "$sales_count",
+            "expenses": "$expenses"
+        }},
+        {"$group": {
+            "_id": {"$month": "$on"},
+            "revenue": {"$sum": "$revenue"},
+            "sales_count": {"$sum": "$sales_count"},
+            "expenses": {"$sum": "$expenses"}
+        }}
+    ]
+    # Room count never changes within the report, fetch it once alongside the totals
+    total_rooms, rows, stays = await gather_bounded(
+        db.rooms.count_documents({}),
+        db.daily_ledger.aggregate(pipeline).to_list(None),
+        fetch_stays(year_start.date(), date(year, 12, 31))
+    )
+    totals = {row["_id"]: row for row in rows}
+    
+    # Occupied room nights per month from the occupancy engine
+    occupied = occupied_rooms_per_day(stays, year_start.date(), date(year, 12, 31))
+    room_nights = [nights for _, _, nights in occupancy_buckets(occupied, year_start.date(), "month")]
+    
     monthly_data = []
     
     for month in range(1, 13):
@@ -716,36 +2245,16 @@ async def get_monthly_reports(year: Optional[int] = None):
         else:
             end_date = datetime(year, month + 1, 1) - timedelta(days=1)
         
-        # Calculate monthly revenue from actual daily sales (payment collected)
-        monthly_revenue = 0
-        daily_sales = await db.daily_sales.find({
-            "date": {"$gte": start_date, "$lte": end_date}
-        }).to_list(1000)
-        
-        for sale in daily_sales:
-            monthly_revenue += sale.get("total_amount", 0)
-        
-        # Calculate monthly expenses
-        monthly_expenses = 0
-        expenses = await db.expenses.find({
-            "expense_date": {"$gte": start_date, "$lte": end_date}
-        }).to_list(1000)
-        
-        for expense in expenses:
-            monthly_expenses += expense.get("amount", 0)
+        month_totals = totals.get(month, {})
         
+        # Monthly revenue from actual daily sales (payment collected)
+        monthly_revenue = month_totals.get("revenue", 0)
+        monthly_expenses = month_totals.get("expenses", 0)
         monthly_profit = monthly_revenue - monthly_expenses
         
-        # Calculate occupancy rate based on bookings
-        total_rooms = await db.rooms.count_documents({})
-        completed_bookings = await db.bookings.find({
-            "status": "Completed",
-            "check_out_date": {"$gte": start_date, "$lte": end_date}
-        }).to_list(1000)
-        
-        occupied_days = len(completed_bookings)
+        # Occupancy rate = occupied room nights / available room nights
         days_in_month = (end_date - start_date).days + 1
-        occupancy_rate = (occupied_days / (total_rooms * days_in_month)) * 100 if total_rooms > 0 else 0
+        occupancy_rate = (room_nights[month - 1] / (total_rooms * days_in_month)) * 100 if total_rooms > 0 else 0
         
         monthly_data.append({
             "month": month,
@@ -753,10 +2262,11 @@ async def get_monthly_reports(year: Optional[int] = None):
             "revenue": monthly_revenue,
             "expenses": monthly_expenses,
             "profit": monthly_profit,
-            "sales_count": len(daily_sales),
+            "sales_count": month_totals.get("sales_count", 0),
             "occupancy_rate": round(occupancy_rate, 2)
         })
     
+    report_cache.put(cache_key, monthly_data, generation)
     return monthly_data
 
 @api_router.get("/reports/comparison")
@@ -774,25 +2284,17 @@ async def get_month_comparison():
     
     current_month_end = current_date
     
+    cache_key = ("reports/comparison", last_month_start.date(), current_month_end.date())
+    cached = report_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = report_cache.generation
+    
     async def get_month_data(start_date, end_date, label):
-        # Revenue calculation from actual daily sales (payment collected)
-        revenue = 0
-        daily_sales = await db.daily_sales.find({
-            "date": {"$gte": start_date, "$lte": end_date}
-        }).to_list(1000)
-        
-        for sale in daily_sales:
-            revenue += sale.get("total_amount", 0)
-        
-        # Expenses calculation
-        expenses = 0
-        expense_records = await db.expenses.find({
-            "expense_date": {"$gte": start_date, "$lte": end_date}
-        }).to_list(1000)
-        
-        for expense in expense_records:
-            expenses += expense.get("amount", 0)
-        
+        # Revenue (payment collected) and expenses from the daily ledger
+        totals = sum_ledger(await read_ledger(start_date, end_date, breakdowns=False))
+        revenue = totals["room_revenue"]
+        expenses = totals["expenses"]
         profit = revenue - expenses
         
         return {
@@ -800,12 +2302,14 @@ async def get_month_comparison():
             "revenue": revenue,
             "expenses": expenses,
             "profit": profit,
-            "sales_count": len(daily_sales),
-            "expenses_count": len(expense_records)
+            "sales_count": totals["sales_count"],
+            "expenses_count": totals["expenses_count"]
         }
     
-    last_month_data = await get_month_data(last_month_start, last_month_end, "Last Month")
-    current_month_data = await get_month_data(current_month_start, current_month_end, "Current Month")
+    last_month_data, current_month_data = await gather_bounded(
+        get_month_data(last_month_start, last_month_end, "Last Month"),
+        get_month_data(current_month_start, current_month_end, "Current Month")
+    )
     
     # Calculate percentage changes
     def calculate_change(current, previous):
@@ -824,19 +2328,13 @@ async def get_month_comparison():
         }
     }
     
+    report_cache.put(cache_key, comparison, generation)
     return comparison
 
 # Expense Management Routes
-@api_router.get("/expenses", response_model=List[Expense])
-async def get_expenses():
-    expenses = await db.expenses.find().sort("expense_date", -1).to_list(1000)
-    
-    # Convert datetime back to date for response
-    for expense in expenses:
-        if isinstance(expense.get('expense_date'), datetime):
-            expense['expense_date'] = expense['expense_date'].date()
-    
-    return [Expense(**expense) for expense in expenses]
+@api_router.get("/expenses", response_model=List[Expense], dependencies=[conditional("expenses")])
+async def get_expenses(response: Response, limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
+    return await list_page(Expense, db.expenses, {}, "expense_date", -1, limit, after, response, fields)
 
 @api_router.post("/expenses", response_model=Expense)
 async def create_expense(expense: ExpenseCreate):
@@ -847,33 +2345,30 @@ async def create_expense(expense: ExpenseCreate):
         expense_dict['expense_date'] = datetime.strptime(expense_dict['expense_date'], '%Y-%m-%d').date()
     
     expense_obj = Expense(**expense_dict)
-    
-    # Convert date to datetime for MongoDB storage
     expense_storage = expense_obj.dict()
-    if expense_storage.get('expense_date'):
-        expense_storage['expense_date'] = datetime.combine(expense_storage['expense_date'], datetime.min.time())
     
-    await db.expenses.insert_one(expense_storage)
+    async with write_set() as writes:
+        await db.expenses.insert_one(expense_storage, session=writes.session)
+        writes.on_rollback(lambda: db.expenses.delete_one({"id": expense_obj.id}))
+        await record_in_ledger("expenses", expense_storage, session=writes.session)
+    record_write("expenses")
     return expense_obj
 
 @api_router.delete("/expenses/{expense_id}")
 async def delete_expense(expense_id: str):
-    result = await db.expenses.delete_one({"id": expense_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Expense not found")
+    async with write_set() as writes:
+        expense = await db.expenses.find_one_and_delete({"id": expense_id}, session=writes.session)
+        if not expense:
+            raise HTTPException(status_code=404, detail="Expense not found")
+        writes.on_rollback(lambda: db.expenses.insert_one(expense))
+        await record_in_ledger("expenses", expense, sign=-1, session=writes.session)
+    record_write("expenses")
     return {"message": "Expense deleted successfully"}
 
 # Income Management Routes
-@api_router.get("/incomes", response_model=List[Income])
-async def get_incomes():
-    incomes = await db.incomes.find().sort("income_date", -1).to_list(1000)
-    
-    # Convert datetime back to date for response
-    for income in incomes:
-        if isinstance(income.get('income_date'), datetime):
-            income['income_date'] = income['income_date'].date()
-    
-    return [Income(**income) for income in incomes]
+@api_router.get("/incomes", response_model=List[Income], dependencies=[conditional("incomes")])
+async def get_incomes(response: Response, limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
+    return await list_page(Income, db.incomes, {}, "income_date", -1, limit, after, response, fields)
 
 @api_router.post("/incomes", response_model=Income)
 async def create_income(income: IncomeCreate):
@@ -884,24 +2379,28 @@ async def create_income(income: IncomeCreate):
         income_dict['income_date'] = datetime.strptime(income_dict['income_date'], '%Y-%m-%d').date()
     
     income_obj = Income(**income_dict)
-    
-    # Convert date to datetime for MongoDB storage
     income_storage = income_obj.dict()
-    if income_storage.get('income_date'):
-        income_storage['income_date'] = datetime.combine(income_storage['income_date'], datetime.min.time())
     
-    await db.incomes.insert_one(income_storage)
+    async with write_set() as writes:
+        await db.incomes.insert_one(income_storage, session=writes.session)
+        writes.on_rollback(lambda: db.incomes.delete_one({"id": income_obj.id}))
+        await record_in_ledger("incomes", income_storage, session=writes.session)
+    record_write("incomes")
     return income_obj
 
 @api_router.delete("/incomes/{income_id}")
 async def delete_income(income_id: str):
-    result = await db.incomes.delete_one({"id": income_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Income not found")
+    async with write_set() as writes:
+        income = await db.incomes.find_one_and_delete({"id": income_id}, session=writes.session)
+        if not income:
+            raise HTTPException(status_code=404, detail="Income not found")
+        writes.on_rollback(lambda: db.incomes.insert_one(income))
+        await record_in_ledger("incomes", income, sign=-1, session=writes.session)
+    record_write("incomes")
     return {"message": "Income deleted successfully"}
 
-@api_router.get("/daily-sales")
-async def get_daily_sales(start_date: Optional[str] = None, end_date: Optional[str] = None):
+@api_router.get("/daily-sales", dependencies=[conditional("daily_sales", daily=True)])
+async def get_daily_sales(response: Response, start_date: Optional[str] = None, end_date: Optional[str] = None, limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None, fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
     # Default to current month if no dates provided
     if not start_date or not end_date:
         today = datetime.now().date()
@@ -915,16 +2414,8 @@ async def get_daily_sales(start_date: Optional[str] = None, end_date: Optional[s
     start_datetime = datetime.combine(start_date_obj, datetime.min.time())
     end_datetime = datetime.combine(end_date_obj, datetime.max.time())
     
-    daily_sales = await db.daily_sales.find({
-        "date": {"$gte": start_datetime, "$lte": end_datetime}
-    }).sort("date", -1).to_list(1000)
-    
-    # Convert datetime back to date for response
-    for sale in daily_sales:
-        if isinstance(sale.get('date'), datetime):
-            sale['date'] = sale['date'].date()
-    
-    return [DailySale(**sale) for sale in daily_sales]
+    query = {"date": {"$gte": start_datetime, "$lte": end_datetime}}
+    return await list_page(DailySale, db.daily_sales, query, "date", -1, limit, after, response, fields)
 
 @api_router.get("/financial-summary")
 async def get_financial_summary(start_date: Optional[str] = None, end_date: Optional[str] = None):
@@ -937,80 +2428,39 @@ async def get_financial_summary(start_date: Optional[str] = None, end_date: Opti
         start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
         end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
     
+    cache_key = ("financial-summary", start_date, end_date)
+    cached = report_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = report_cache.generation
+    
     # Convert dates to datetime for MongoDB query
     start_datetime = datetime.combine(start_date, datetime.min.time())
     end_datetime = datetime.combine(end_date, datetime.max.time())
     
-    # Calculate revenue from actual daily sales (payment collected)
-    daily_sales = await db.daily_sales.find({
-        "date": {"$gte": start_datetime, "$lte": end_datetime}
-    }).to_list(1000)
+    # Totals and category/payment breakdowns come from the daily ledger
+    ledger = sum_ledger(await read_ledger(start_datetime, end_datetime))
     
-    room_revenue = 0
-    revenue_breakdown = {}
-    payment_method_breakdown = {}
+    # Revenue from actual daily sales (payment collected)
+    room_revenue = ledger["room_revenue"]
+    payment_method_breakdown = ledger["payment_methods"]
     
-    for sale in daily_sales:
-        # Total revenue from actual payments collected
-        sale_amount = sale.get("total_amount", 0)
-        room_revenue += sale_amount
-        
-        # Revenue breakdown by room type (get room info for breakdown)
-        room_number = sale.get("room_number", "")
-        if room_number:
-            room = await db.rooms.find_one({"room_number": room_number})
-            if room:
-                room_type = room.get("room_type", "Unknown")
-                if room_type not in revenue_breakdown:
-                    revenue_breakdown[room_type] = 0
-                revenue_breakdown[room_type] += sale_amount
-        
-        # Payment method breakdown
-        payment_method = sale.get("payment_method", "Unknown")
-        if payment_method not in payment_method_breakdown:
-            payment_method_breakdown[payment_method] = 0
-        payment_method_breakdown[payment_method] += sale_amount
-    
-    # Calculate additional income (non-room income)
-    additional_incomes = await db.incomes.find({
-        "income_date": {"$gte": start_datetime, "$lte": end_datetime}
-    }).to_list(1000)
-    
-    additional_income_total = 0
-    income_breakdown = {}
-    
-    for income in additional_incomes:
-        amount = income.get("amount", 0)
-        additional_income_total += amount
-        
-        category = income.get("category", "Other")
-        if category not in income_breakdown:
-            income_breakdown[category] = 0
-        income_breakdown[category] += amount
+    # Revenue breakdown by room type, snapshotted on each sale at checkout
+    revenue_breakdown = ledger["room_types"]
+    
+    # Additional income (non-room income)
+    additional_income_total = ledger["additional_income"]
+    income_breakdown = ledger["income_categories"]
     
     # Total revenue = room revenue + additional income
     total_revenue = room_revenue + additional_income_total
     
-    # Calculate expenses
-    expenses = await db.expenses.find({
-        "expense_date": {"$gte": start_datetime, "$lte": end_datetime}
-    }).to_list(1000)
-    
-    total_expenses = 0
-    expense_breakdown = {}
-    
-    for expense in expenses:
-        amount = expense.get("amount", 0)
-        total_expenses += amount
-        
-        category = expense.get("category", "Other")
-        if category not in expense_breakdown:
-            expense_breakdown[category] = 0
-        expense_breakdown[category] += amount
+    total_expenses = ledger["expenses"]
+    expense_breakdown = ledger["expense_categories"]
     
     net_profit = total_revenue - total_expenses
     
-    return {
+    summary = {
         "total_revenue": total_revenue,
         "room_revenue": room_revenue,
         "additional_income": additional_income_total,
@@ -1023,12 +2473,414 @@ async def get_financial_summary(start_date: Optional[str] = None, end_date: Opti
         "period_start": start_date,
         "period_end": end_date
     }
+    
+    report_cache.put(cache_key, summary, generation)
+    return summary
+
+@api_router.get("/reports/cache-stats")
+async def get_report_cache_stats():
+    # Hit/miss counters for monitoring the report cache
+    return report_cache.stats()
+
+# Streaming Export Routes
+# Collections that can be exported, with the model defining their columns and the
+# date field used for range filtering
+EXPORTS = {
+    "daily_sales": (DailySale, "date"),
+    "incomes": (Income, "income_date"),
+    "expenses": (Expense, "expense_date"),
+}
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+def export_value(value, is_date: bool):
+    """Render one stored value the way the API returns it."""
+    if isinstance(value, datetime):
+        return value.date().isoformat() if is_date else value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+async def export_chunks(cursor, columns: List[str], date_field: str, fmt: str):
+    """Yield CSV or NDJSON text in ~64KB chunks straight from a Motor cursor."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(columns)
+    
+    async for doc in cursor:
+        row = {column: export_value(doc.get(column), column == date_field) for column in columns}
+        if fmt == "csv":
+            writer.writerow(["" if row[column] is None else row[column] for column in columns])
+        else:
+            buffer.write(json.dumps(row))
+            buffer.write("\n")
+        
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+async def gzip_chunks(chunks):
+    """Gzip a stream of text chunks on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk.encode())
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+@api_router.get("/export/{collection}")
+async def export_collection(collection: str, start_date: Optional[str] = None, end_date: Optional[str] = None, format: str = "csv", gzip: bool = False):
+    if collection not in EXPORTS:
+        raise HTTPException(status_code=404, detail="Unknown export collection")
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="Format must be csv or ndjson")
+    
+    model, date_field = EXPORTS[collection]
+    columns = list(model.model_fields)
+    
+    # Export everything unless a range is given
+    query = {}
+    if start_date or end_date:
+        query[date_field] = {}
+        if start_date:
+            query[date_field]["$gte"] = datetime.combine(datetime.strptime(start_date, '%Y-%m-%d').date(), datetime.min.time())
+        if end_date:
+            query[date_field]["$lte"] = datetime.combine(datetime.strptime(end_date, '%Y-%m-%d').date(), datetime.max.time())
+    
+    cursor = db[collection].find(query, {"_id": 0}).sort(date_field, 1).batch_size(EXPORT_BATCH_SIZE)
+    chunks = export_chunks(cursor, columns, date_field, format)
+    
+    filename = f"{collection}.{format}"
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        filename += ".gz"
+        media_type = "application/gzip"
+    
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+# Live change feed
+# Small delta events for rooms, bookings and customers streamed over /api/events.
+# On a replica set a change stream feeds the broker, so writes from any worker or
+# tool are seen; otherwise the write handlers publish their own changes.
+EVENT_COLLECTIONS = ["rooms", "bookings", "customers"]
+EVENT_DATE_FIELDS = {"check_in_date", "check_out_date"}
+EVENT_QUEUE_SIZE = 256
+EVENT_REPLAY_SIZE = 1000
+EVENT_KEEPALIVE_SECONDS = 15
+
+class EventBroker:
+    """Fan out change events to SSE subscribers, keeping a short replay buffer.
+    
+    Every event gets a sequence number sent as the SSE id, so a reconnecting
+    client resumes with Last-Event-ID. A client that has missed events it cannot
+    replay (or fell too far behind) gets a ``resync`` event and refetches.
+    """
+    
+    def __init__(self):
+        self.subscribers = set()
+        self.recent = deque(maxlen=EVENT_REPLAY_SIZE)
+        self.sequence = 0
+        self.watcher = None
+    
+    @property
+    def local(self) -> bool:
+        """Whether write handlers publish their own changes (no change stream)."""
+        return self.watcher is None
+    
+    def emit(self, event: dict):
+        self.sequence += 1
+        event = {"seq": self.sequence, **event}
+        self.recent.append(event)
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too slow to keep up: drop the backlog and ask the client to refetch
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"seq": self.sequence, "op": "resync"})
+    
+    def publish(self, collection: str, op: str, doc_id: str, fields: Optional[dict] = None):
+        """Publish a write made by this process, unless a change stream reports it."""
+        if self.local:
+            self.emit(change_delta(collection, op, doc_id, fields))
+    
+    def resync(self):
+        """Tell clients to refetch everything after a bulk change."""
+        if self.local:
+            self.emit({"op": "resync"})
+    
+    def subscribe(self, last_seq: Optional[int] = None):
+        """Register a subscriber; returns its queue and the events to replay first."""
+        queue = asyncio.Queue(EVENT_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        if last_seq is None or last_seq == self.sequence:
+            return queue, []
+        oldest = self.recent[0]["seq"] if self.recent else self.sequence + 1
+        if last_seq > self.sequence or last_seq < oldest - 1:
+            return queue, [{"seq": self.sequence, "op": "resync"}]
+        return queue, [event for event in self.recent if event["seq"] > last_seq]
+    
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+    
+    async def start(self):
+        # Change streams need a replica set, the same requirement as transactions
+        if not await transactions_supported():
+            return
+        for name in EVENT_COLLECTIONS:
+            try:
+                # Pre-images give delete events the document id (MongoDB 6.0+)
+                await db.command("collMod", name, changeStreamPreAndPostImages={"enabled": True})
+            except OperationFailure:
+                pass
+        self.watcher = asyncio.create_task(self.watch())
+    
+    async def stop(self):
+        if self.watcher:
+            self.watcher.cancel()
+            self.watcher = None
+    
+    async def watch(self):
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": EVENT_COLLECTIONS},
+            "operationType": {"$in": ["insert", "update", "replace", "delete"]}
+        }}]
+        resume_token = None
+        while True:
+            try:
+                async with db.watch(
+                    pipeline,
+                    full_document="updateLookup",
+                    full_document_before_change="whenAvailable",
+                    resume_after=resume_token
+                ) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        # Writes from other processes invalidate this process's ETags too
+                        collection_versions.bump(change["ns"]["coll"])
+                        self.emit(change_stream_delta(change))
+            except PyMongoError as e:
+                logger.warning("Change stream interrupted, resuming: %s", e)
+                collection_versions.bump(*EVENT_COLLECTIONS)
+                self.emit({"op": "resync"})
+                await asyncio.sleep(1)
+
+def change_delta(collection: str, op: str, doc_id: str, fields: Optional[dict] = None) -> dict:
+    delta = {"collection": collection, "op": op, "id": doc_id}
+    if fields:
+        delta["fields"] = {
+            name: export_value(value, name in EVENT_DATE_FIELDS)
+            for name, value in fields.items() if name != "_id"
+        }
+    return delta
+
+def change_stream_delta(change: dict) -> dict:
+    """Reduce a change stream document to the same delta the handlers publish."""
+    collection = change["ns"]["coll"]
+    document = change.get("fullDocument") or change.get("fullDocumentBeforeChange") or {}
+    doc_id = document.get("id")
+    
+    if change["operationType"] == "update":
+        description = change["updateDescription"]
+        fields = dict(description.get("updatedFields", {}))
+        fields.update({name: None for name in description.get("removedFields", [])})
+        return change_delta(collection, "update", doc_id, fields)
+    if change["operationType"] == "delete":
+        if doc_id is None:
+            # Without pre-images the deleted id is unknown; have clients refetch
+            return {"op": "resync", "collection": collection}
+        return change_delta(collection, "delete", doc_id)
+    return change_delta(collection, "insert", doc_id, document)
+
+events = EventBroker()
+
+def sse_message(event: dict) -> str:
+    name = "resync" if event["op"] == "resync" else event["collection"]
+    return f"id: {event['seq']}\nevent: {name}\ndata: {json.dumps(event)}\n\n"
+
+@api_router.get("/events")
+async def stream_events(last_event_id: Optional[str] = Header(None)):
+    last_seq = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    
+    async def stream():
+        queue, backlog = events.subscribe(last_seq)
+        try:
+            yield "retry: 3000\n\n"
+            for event in backlog:
+                yield sse_message(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment lines keep proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse_message(event)
+        finally:
+            events.unsubscribe(queue)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # Test route
 @api_router.get("/")
 async def root():
     return {"message": "Hotel Management API"}
 
+@api_router.get("/health/db")
+async def database_health():
+    """Ping MongoDB and report how busy this worker's connection pool is."""
+    servers = pool_monitor.snapshot()
+    open_connections = sum(pool["open"] for pool in servers.values())
+    checked_out = sum(pool["checked_out"] for pool in servers.values())
+    max_pool_size = client.options.pool_options.max_pool_size
+    pool = {
+        "max_pool_size": max_pool_size,
+        "min_pool_size": client.options.pool_options.min_pool_size,
+        "open": open_connections,
+        "checked_out": checked_out,
+        "available": open_connections - checked_out,
+        "waiters": sum(pool["waiters"] for pool in servers.values()),
+        "utilization": round(checked_out / max_pool_size, 3) if max_pool_size else None,
+        "servers": servers,
+    }
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(db.command("ping"), HEALTH_PING_TIMEOUT)
+    except (asyncio.TimeoutError, PyMongoError) as error:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "error": str(error) or "ping timed out", "pool": pool})
+    return {"status": "ok", "ping_ms": round((time.perf_counter() - started) * 1000, 2), "pool": pool}
+
+# Response compression
+# Negotiated per request from Accept-Encoding, with brotli preferred when it is
+# configured and installed. Small bodies are sent as-is; streamed bodies (exports)
+# are compressed chunk by chunk and flushed so each chunk reaches the client as
+# soon as it is produced. Event streams and already-compressed files pass through.
+RESPONSE_COMPRESSION = [
+    encoding.strip() for encoding in os.environ.get('RESPONSE_COMPRESSION', 'br,gzip').split(',')
+    if encoding.strip() and (encoding.strip() != "br" or brotli is not None)
+]
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '4'))
+UNCOMPRESSED_TYPES = ("text/event-stream", "application/gzip", "image/")
+
+class StreamCompressor:
+    """Incremental gzip or brotli encoder producing independently flushed chunks."""
+    
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.process(data) + self.compressor.flush()
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+    
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.finish()
+        return self.compressor.flush()
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """The first configured encoding the client accepts, if any."""
+    accepted = set()
+    refused = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.partition(";")
+        params = params.replace(" ", "")
+        try:
+            weight = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            weight = 1.0
+        (accepted if weight > 0 else refused).add(name.strip())
+    for encoding in RESPONSE_COMPRESSION:
+        # An explicit q=0 refuses the encoding even when "*" is accepted
+        if encoding in accepted or ("*" in accepted and encoding not in refused):
+            return encoding
+    return None
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start = None
+        compressor = None
+        passthrough = False
+        
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                headers = Headers(raw=message["headers"])
+                passthrough = "content-encoding" in headers or headers.get("content-type", "").startswith(UNCOMPRESSED_TYPES)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                if start:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+            
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                # First body message decides: small complete bodies go out as-is
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                del headers["Content-Length"]
+                compressor = StreamCompressor(encoding)
+                if not more_body:
+                    body = compressor.chunk(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    start = None
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start)
+                start = None
+            
+            data = compressor.chunk(body) if body else b""
+            if not more_body:
+                data += compressor.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+        
+        await self.app(scope, receive, send_compressed)
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -1038,8 +2890,11 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+app.add_middleware(CompressionMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -1047,6 +2902,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+async def prepare_database():
+    """Get the database and in-memory indexes ready before the app takes traffic."""
+    # Versions first: writes by other workers while the caches load get refreshed
+    await cache_sync.load_versions()
+    await ensure_indexes()
+    await load_room_intervals()
+    await load_room_catalog()
+    
+    # Backfill the ledger and guest profiles for databases that predate them
+    days = await backfill("daily_ledger", rebuild_daily_ledger)
+    if days is not None:
+        logger.info("Rebuilt daily ledger: %d days", days)
+    guests = await backfill("guests", rebuild_guests)
+    if guests is not None:
+        logger.info("Rebuilt guest profiles: %d guests", guests)
+    
+    await events.start()
+    await cache_sync.start()
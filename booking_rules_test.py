@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Booking rules tests: overlapping stays are rejected with 409 on create and on
+date changes, only upcoming bookings can be checked in, and bulk booking
+reports the outcome of every item.
+"""
+
+import sys
+import uuid
+
+import requests
+
+from checklist import check, summary
+
+# Get backend URL from frontend .env file
+def get_backend_url():
+    try:
+        with open('/app/frontend/.env', 'r') as f:
+            for line in f:
+                if line.startswith('REACT_APP_BACKEND_URL='):
+                    return line.split('=', 1)[1].strip()
+    except Exception as e:
+        print(f"Error reading backend URL: {e}")
+        return None
+
+BASE_URL = get_backend_url()
+if not BASE_URL:
+    print("ERROR: Could not get backend URL from frontend/.env")
+    sys.exit(1)
+
+API_BASE = f"{BASE_URL}/api"
+
+def guest_email(room_number):
+    # One guest per test room, so their bookings are easy to look up
+    return f"{room_number.lower()}@example.com"
+
+
+def new_booking(room_number, check_in, check_out, stay_type="Night Stay", name="Rules Test"):
+    return {
+        "guest_name": name, "guest_email": guest_email(room_number), "guest_phone": "555-0142",
+        "room_number": room_number, "check_in_date": check_in, "check_out_date": check_out,
+        "stay_type": stay_type, "booking_amount": 10000.0
+    }
+
+
+def test_overlapping_create(room_number):
+    print("\n1. Overlapping bookings on create")
+    response = requests.post(f"{API_BASE}/bookings", json=new_booking(room_number, "2031-01-01", "2031-01-05"))
+    check("First booking created", response.status_code == 200, str(response.status_code))
+    first = response.json()
+
+    response = requests.post(f"{API_BASE}/bookings", json=new_booking(room_number, "2031-01-03", "2031-01-07"))
+    check("Overlapping booking rejected with 409", response.status_code == 409, str(response.status_code))
+    check("409 names the conflicting booking", first["id"] in response.json().get("detail", ""), response.text)
+
+    response = requests.post(f"{API_BASE}/bookings", json=new_booking(room_number, "2031-01-05", "2031-01-08"))
+    check("Booking from the check-out day is accepted", response.status_code == 200, str(response.status_code))
+    return first, response.json()
+
+
+def test_overlapping_update(first, second):
+    print("\n2. Overlapping bookings on date change")
+    response = requests.put(f"{API_BASE}/bookings/{second['id']}", json={"check_in_date": "2031-01-04"})
+    check("Moving into another stay rejected with 409", response.status_code == 409, str(response.status_code))
+
+    guest = requests.get(f"{API_BASE}/guests/{guest_email(second['room_number'])}").json()
+    bookings = {booking["id"]: booking for booking in guest["bookings"]}
+    check("Rejected move leaves the dates unchanged", bookings[second["id"]]["check_in_date"] == "2031-01-05")
+
+    response = requests.put(f"{API_BASE}/bookings/{first['id']}", json={"check_out_date": "2031-01-04"})
+    check("Shortening a stay is accepted", response.status_code == 200, str(response.status_code))
+    response = requests.put(f"{API_BASE}/bookings/{second['id']}", json={"check_in_date": "2031-01-04"})
+    check("Moving into the freed night is accepted", response.status_code == 200, str(response.status_code))
+
+
+def test_checkin_rules(room_number, booking):
+    print("\n3. Check-in only for upcoming bookings")
+    response = requests.post(f"{API_BASE}/checkin", json={"booking_id": booking["id"], "advance_amount": 0})
+    check("Upcoming booking checks in", response.status_code == 200, str(response.status_code))
+    customer = response.json().get("customer", {})
+
+    response = requests.post(f"{API_BASE}/checkin", json={"booking_id": booking["id"], "advance_amount": 0})
+    check("Second check-in of the same booking rejected", response.status_code == 400, str(response.status_code))
+
+    response = requests.post(f"{API_BASE}/checkin", json={"booking_id": str(uuid.uuid4()), "advance_amount": 0})
+    check("Unknown booking gives 404", response.status_code == 404, str(response.status_code))
+
+    if customer.get("id"):
+        requests.post(f"{API_BASE}/checkout", json={"customer_id": customer["id"], "payment_method": "Cash"})
+
+    response = requests.post(f"{API_BASE}/bookings", json=new_booking(room_number, "2031-03-01", "2031-03-03"))
+    cancelled = response.json()
+    requests.post(f"{API_BASE}/cancel/{cancelled['id']}")
+    response = requests.post(f"{API_BASE}/checkin", json={"booking_id": cancelled["id"], "advance_amount": 0})
+    check("Cancelled booking cannot be checked in", response.status_code == 400, str(response.status_code))
+
+
+def test_bulk_results(room_number):
+    print("\n4. Bulk booking results")
+    response = requests.post(f"{API_BASE}/bookings/bulk", json=[
+        new_booking(room_number, "2031-02-01", "2031-02-03", name="Bulk One"),
+        new_booking(room_number, "2031-02-02", "2031-02-04", name="Bulk Overlap"),
+        {"guest_name": "Bulk Invalid", "check_in_date": "2031-02-10"},
+        new_booking(room_number, "2031-02-03", "2031-02-03", stay_type="Short Time", name="Bulk Short"),
+    ])
+    check("Bulk request accepted", response.status_code == 200, str(response.status_code))
+    body = response.json()
+    statuses = [result["status"] for result in body["results"]]
+    check("Every item reported in order", statuses == ["created", "conflict", "invalid", "created"], str(statuses))
+    check("Counts match the results", body["created"] == 2 and body["failed"] == 2, f"{body['created']}/{body['failed']}")
+    check("Results carry their index", [result["index"] for result in body["results"]] == [0, 1, 2, 3])
+
+
+def main():
+    print(f"Testing booking rules at: {API_BASE}")
+    print("=" * 80)
+    room_number = f"T{uuid.uuid4().hex[:6]}"
+    response = requests.post(f"{API_BASE}/rooms", json={
+        "room_number": room_number, "room_type": "Double", "price_per_night": 5000.0, "amenities": ["WiFi"]
+    })
+    if response.status_code != 200:
+        print(f"ERROR: Could not create test room: {response.status_code} {response.text}")
+        return False
+    room = response.json()
+
+    try:
+        first, second = test_overlapping_create(room_number)
+        test_overlapping_update(first, second)
+        test_checkin_rules(room_number, first)
+        test_bulk_results(room_number)
+    finally:
+        requests.delete(f"{API_BASE}/rooms/{room['id']}")
+
+    return summary()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,20 @@
+"""
+Pass/fail bookkeeping shared by the check scripts in this directory.
+
+Each script calls ``check`` once per assertion and ends with ``summary``,
+whose result becomes the exit status.
+"""
+
+results = []
+
+
+def check(name, passed, detail=""):
+    results.append(passed)
+    print(f"{'✅' if passed else '❌'} {name}{f' - {detail}' if detail else ''}")
+
+
+def summary():
+    """Print the tally and return True when every check passed."""
+    print("\n" + "=" * 80)
+    print(f"{sum(results)}/{len(results)} checks passed")
+    return all(results)
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Unit checks for the backend's pure helpers and in-process caches, one numbered
+section per feature. No server or database is needed; the backend module is
+imported directly.
+"""
+
+import asyncio
+import sys
+import zlib
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+import server  # noqa: E402
+from checklist import check, summary  # noqa: E402
+
+
+def booking(booking_id, room, check_in, check_out):
+    return {"id": booking_id, "room_number": room, "check_in_date": check_in, "check_out_date": check_out}
+
+
+def test_room_stays():
+    print("\n1. RoomStays overlap search")
+    stays = server.RoomStays()
+    stays.add(date(2031, 1, 1), date(2031, 1, 5), "a")
+    stays.add(date(2031, 1, 10), date(2031, 1, 12), "b")
+    stays.add(date(2031, 1, 2), date(2031, 1, 20), "long")
+
+    check("Overlap inside a long stay is found", stays.overlapping(date(2031, 1, 14), date(2031, 1, 15)) is not None)
+    stays.remove(date(2031, 1, 2), date(2031, 1, 20), "long")
+    check("Gap between stays is free", stays.overlapping(date(2031, 1, 5), date(2031, 1, 10)) is None)
+    check("Check-out day is free for the next guest", stays.overlapping(date(2031, 1, 5), date(2031, 1, 6)) is None)
+    check("Last night is taken", stays.overlapping(date(2031, 1, 4), date(2031, 1, 5))[2] == "a")
+    check("Excluded stay is ignored", stays.overlapping(date(2031, 1, 4), date(2031, 1, 5), exclude_id="a") is None)
+
+
+def test_room_interval_index():
+    print("\n2. RoomIntervalIndex conflicts")
+    index = server.RoomIntervalIndex()
+    index.rebuild([
+        booking("a", "101", date(2031, 1, 1), date(2031, 1, 5)),
+        booking("b", "102", date(2031, 1, 1), date(2031, 1, 5)),
+    ])
+    check("Same room, overlapping dates conflict", index.find_conflict("101", date(2031, 1, 3), date(2031, 1, 7)) == "a")
+    check("Other room does not conflict", index.find_conflict("103", date(2031, 1, 3), date(2031, 1, 7)) is None)
+    check("Short Time stay on the check-out day is free", index.find_conflict("101", date(2031, 1, 5), date(2031, 1, 5)) is None)
+    check("Short Time stay on a booked night conflicts", index.find_conflict("101", date(2031, 1, 4), date(2031, 1, 4)) == "a")
+
+    index.add(booking("a", "101", date(2031, 2, 1), date(2031, 2, 3)))
+    check("Re-adding a booking moves its stay", index.find_conflict("101", date(2031, 1, 3), date(2031, 1, 7)) is None)
+    index.remove("b")
+    check("Removed booking frees its room", index.find_conflict("102", date(2031, 1, 1), date(2031, 1, 5)) is None)
+    index.remove("missing")
+    check("Removing an unknown booking is a no-op", "a" in index.bookings)
+
+
+def test_ledger():
+    print("\n3. Ledger deltas and sums")
+    expense = {"amount": 0.1, "category": "Misc. Supplies", "expense_date": date(2031, 1, 5)}
+    delta = server.ledger_delta("expenses", expense)
+    check("Delta adds amount and count", delta["expenses"] == 0.1 and delta["expenses_count"] == 1, str(delta))
+    key = server.ledger_key("Misc. Supplies")
+    check("Category key is safe for an $inc path", "." not in key and "$" not in key, key)
+    check("Category key maps back to its name", server.ledger_name(server.ledger_key("Cost $ 100%")) == "Cost $ 100%")
+    removed = server.ledger_delta("expenses", expense, sign=-1)
+    check("Removal delta negates the amount", removed["expenses"] == -0.1 and removed["expenses_count"] == -1, str(removed))
+
+    sale = {"total_amount": 5500.0, "payment_method": None, "room_type": "Suite", "date": date(2031, 1, 5)}
+    sale_delta = server.ledger_delta("daily_sales", sale)
+    check("Missing payment method is filed as Unknown", "payment_methods.Unknown" in sale_delta, str(sale_delta))
+
+    # Two expenses added then removed leave float residue in the stored entry
+    entry = {"date": datetime(2031, 1, 5), "expenses": 0.1 + 0.2 - 0.1 - 0.2, "expenses_count": 0,
+             "expense_categories": {key: 0.1 + 0.2 - 0.1 - 0.2, server.ledger_key("Food"): 35.5}}
+    other_day = {"date": datetime(2031, 1, 6), "expenses": 35.5, "expenses_count": 1, "room_revenue": 100.0,
+                 "expense_categories": {server.ledger_key("Food"): 0.0}}
+    summary = server.sum_ledger([entry, other_day])
+    check("Residue rounds away in totals", summary["expenses"] == 35.5, str(summary["expenses"]))
+    check("Deleted categories drop out", summary["expense_categories"] == {"Food": 35.5}, str(summary["expense_categories"]))
+    check("Totals missing from an entry count as zero", summary["room_revenue"] == 100.0 and summary["additional_income"] == 0)
+
+
+def test_occupied_rooms_per_day():
+    print("\n4. occupied_rooms_per_day")
+    start, end = date(2031, 1, 1), date(2031, 1, 7)
+    stays = [
+        {"check_in_date": date(2030, 12, 30), "check_out_date": date(2031, 1, 3)},  # starts before the range
+        {"check_in_date": date(2031, 1, 2), "check_out_date": date(2031, 1, 4)},
+        {"check_in_date": date(2031, 1, 5), "check_out_date": date(2031, 1, 5)},  # Short Time
+        {"check_in_date": date(2031, 1, 6), "check_out_date": date(2031, 1, 10)},  # ends after the range
+    ]
+    occupied = server.occupied_rooms_per_day(stays, start, end).tolist()
+    check("Per-day counts", occupied == [1, 2, 1, 0, 1, 1, 1], str(occupied))
+    empty = server.occupied_rooms_per_day([], start, end).tolist()
+    check("No stays gives zeros for every day", empty == [0] * 7, str(empty))
+
+
+def test_guest_search_keys():
+    print("\n5. Guest typeahead keys")
+    keys = server.guest_search_keys({
+        "guest_name": "Дмитрий Иванов", "guest_email": "D.Ivanov@example.com",
+        "guest_phone": "+7 (495) 123-4567", "guest_id_passport": None
+    })
+    check("Cyrillic name words are kept", "дмитрий" in keys and "иванов" in keys, str(keys))
+    check("Whole name is one key", "дмитрийиванов" in keys)
+    check("Email local part is a key", "divanov" in keys)
+    check("Phone digit suffixes are keys", "74951234567" in keys and "4567" in keys and "567" not in keys)
+    check("Query matches the stored key", server.search_key("ИВАН") == "иван" and "иванов".startswith(server.search_key("ИВАН")))
+    check("Punctuation and underscores are dropped", server.search_key("O'Brien_Jr.") == "obrienjr")
+
+
+def test_guest_update():
+    print("\n6. Guest profile updates")
+    stay = {"guest_email": "g@example.com", "guest_name": "G", "check_out_date": date(2031, 1, 5)}
+    created = server.guest_update(stay, None, "Upcoming")
+    check("New booking counts a booking and an upcoming one",
+          created["$inc"] == {"total_bookings": 1, "upcoming_bookings": 1}, str(created))
+    completed = server.guest_update(stay, "Checked In", "Completed")
+    check("Completion counts a stay and raises last_stay",
+          completed["$inc"] == {"total_stays": 1} and completed["$max"]["last_stay"] == datetime(2031, 1, 5), str(completed))
+    cancelled = server.guest_update(stay, "Completed", "Cancelled")
+    check("Cancelling a completed stay takes it back", cancelled == {"$inc": {"total_stays": -1}}, str(cancelled))
+    check("Staying Completed only re-asserts last_stay", server.guest_update(stay, "Completed", "Completed") == {"$max": {"last_stay": datetime(2031, 1, 5)}})
+
+
+def run_asgi(app, accept_encoding="gzip"):
+    """Call an ASGI app directly and collect the messages it sends."""
+    sent = []
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+def responder(*chunks, content_type="application/json"):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", content_type.encode())]})
+        for index, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+    return app
+
+
+def test_compression():
+    print("\n7. Response compression")
+    configured = server.RESPONSE_COMPRESSION
+    server.RESPONSE_COMPRESSION = ["gzip"]
+    try:
+        check("Listed encoding is chosen", server.negotiate_encoding("deflate, gzip") == "gzip")
+        check("Wildcard accepts any configured encoding", server.negotiate_encoding("*") == "gzip")
+        check("q=0 refuses an encoding", server.negotiate_encoding("gzip;q=0") is None)
+        check("q=0 refuses it even alongside *", server.negotiate_encoding("gzip;q=0, *") is None)
+        check("*;q=0 alone refuses everything", server.negotiate_encoding("*;q=0") is None)
+
+        small = run_asgi(server.CompressionMiddleware(responder(b"x" * 100), minimum_size=1024))
+        check("Body under the threshold is sent as-is",
+              small[1]["body"] == b"x" * 100 and b"content-encoding" not in dict(small[0]["headers"]))
+
+        large = run_asgi(server.CompressionMiddleware(responder(b"x" * 4096), minimum_size=1024))
+        headers = dict(large[0]["headers"])
+        body = large[1]["body"]
+        check("Body over the threshold is gzipped",
+              headers.get(b"content-encoding") == b"gzip" and zlib.decompress(body, 16 + zlib.MAX_WBITS) == b"x" * 4096)
+        check("Compressed length is declared", headers.get(b"content-length") == str(len(body)).encode())
+
+        chunks = [b"a" * 10, b"b" * 10, b""]
+        streamed = run_asgi(server.CompressionMiddleware(responder(*chunks), minimum_size=1024))
+        bodies = [message["body"] for message in streamed[1:]]
+        check("Streamed body is compressed even when small",
+              dict(streamed[0]["headers"]).get(b"content-encoding") == b"gzip" and b"content-length" not in dict(streamed[0]["headers"]))
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        check("Each chunk is flushed as it arrives", decoder.decompress(bodies[0]) == b"a" * 10, str(bodies))
+        check("Stream decodes to the original", decoder.decompress(b"".join(bodies[1:])) == b"b" * 10 and decoder.eof)
+
+        events = run_asgi(server.CompressionMiddleware(responder(b"x" * 4096, content_type="text/event-stream")))
+        check("Event streams pass through", events[1]["body"] == b"x" * 4096)
+        refused = run_asgi(server.CompressionMiddleware(responder(b"x" * 4096)), accept_encoding="gzip;q=0")
+        check("Refused encoding leaves the body alone", refused[1]["body"] == b"x" * 4096)
+    finally:
+        server.RESPONSE_COMPRESSION = configured
+
+
+def test_report_cache():
+    print("\n8. Report cache invalidation")
+    cache = server.ReportCache(max_entries=2)
+    january = ("reports/daily", date(2031, 1, 1), date(2031, 1, 31))
+    february = ("reports/daily", date(2031, 2, 1), date(2031, 2, 28))
+    yearly = ("reports/monthly", date(2031, 1, 1), date(2031, 12, 31))
+    for key in (january, february):
+        cache.put(key, key[1].month, cache.generation)
+    check("Cached result is returned", cache.get(january) == 1)
+
+    cache.invalidate(date(2031, 2, 14))
+    check("Write drops reports covering its day", cache.get(february) is None)
+    check("Reports for other ranges survive", cache.get(january) == 1)
+
+    generation = cache.generation
+    cache.invalidate(date(2031, 1, 10))
+    cache.put(january, "stale", generation)
+    check("Result computed across a write is not cached", cache.get(january) is None)
+
+    cache.put(january, 1, cache.generation)
+    cache.put(yearly, 12, cache.generation)
+    cache.invalidate_endpoint("reports/monthly")
+    check("Endpoint invalidation keeps other endpoints", cache.get(yearly) is None and cache.get(january) == 1)
+    cache.put(february, 2, cache.generation)
+    cache.put(yearly, 12, cache.generation)
+    check("Least recently used entry is evicted", cache.get(january) is None and cache.stats()["evictions"] == 1)
+
+
+def test_cursors():
+    print("\n9. Pagination cursors")
+    created = datetime(2031, 1, 5, 12, 30, 15, 250000)
+    cursor = server.encode_cursor({"id": "a1", "created_at": created}, "created_at")
+    check("Datetime sort value round-trips as a datetime", server.decode_cursor(cursor) == (created, "a1"))
+    cursor = server.encode_cursor({"id": "b2", "room_number": "101"}, "room_number")
+    check("String sort value round-trips", server.decode_cursor(cursor) == ("101", "b2"))
+    check("ISO date string stays a string", server.decode_cursor(server.encode_cursor({"id": "c3", "day": "2031-01-05"}, "day"))[0] == "2031-01-05")
+    check("Missing sort value round-trips as None", server.decode_cursor(server.encode_cursor({"id": "d4"}, "created_at")) == (None, "d4"))
+    try:
+        server.decode_cursor("not-a-cursor")
+        check("Garbage cursor gives 400", False)
+    except server.HTTPException as e:
+        check("Garbage cursor gives 400", e.status_code == 400)
+
+
+class Tomorrow(date):
+    @classmethod
+    def today(cls):
+        return date.today() + timedelta(days=1)
+
+
+def etag_for(dependency, if_none_match=None):
+    """Run a conditional() dependency; the ETag it set, or 304."""
+    response = server.Response()
+    try:
+        asyncio.run(dependency.dependency(response, if_none_match))
+    except server.HTTPException as e:
+        return e.status_code
+    return response.headers["ETag"]
+
+
+def test_etags():
+    print("\n10. Conditional GET ETags")
+    versions = server.collection_versions
+    plain = server.conditional("incomes")
+    daily = server.conditional("daily_sales", daily=True)
+
+    etag = etag_for(plain)
+    check("Unchanged collection answers 304", etag_for(plain, etag) == 304)
+    check("Any of several listed tags matches", etag_for(plain, f'W/"other", {etag}') == 304)
+    versions.bump("incomes")
+    check("A write changes the ETag", etag_for(plain, etag) != 304)
+
+    etag = etag_for(daily)
+    check("Daily ETag carries today's date", etag.endswith(f'-{date.today().isoformat()}"'), etag)
+    check("Same day answers 304", etag_for(daily, etag) == 304)
+    server.date = Tomorrow
+    try:
+        check("Next day gets a new ETag without a write", etag_for(daily, etag) != 304)
+    finally:
+        server.date = date
+    other_process = server.CollectionVersions()
+    other_process.versions = dict(versions.versions)
+    check("Another process's ETags never match", other_process.etag(["incomes"]) != versions.etag(["incomes"]))
+
+
+def main():
+    print("Testing backend helpers")
+    print("=" * 80)
+    test_room_stays()
+    test_room_interval_index()
+    test_ledger()
+    test_occupied_rooms_per_day()
+    test_guest_search_keys()
+    test_guest_update()
+    test_compression()
+    test_report_cache()
+    test_cursors()
+    test_etags()
+    return summary()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Multi-worker cache sync test for the Hotel Management backend.
+
+Starts two API workers with CACHE_SYNC on against a scratch database, writes
+through one and checks that the other's in-process caches (room availability,
+booking intervals, report results, list ETags) converge without a restart.
+
+Run from the repository root with MongoDB reachable at backend/.env's MONGO_URL.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+from checklist import check, summary
+
+BACKEND_DIR = Path(__file__).resolve().parent / "backend"
+DB_NAME = "hotel_multi_worker_test"
+PORTS = [8101, 8102]
+CONVERGE_SECONDS = 10
+
+def start_worker(port):
+    env = {**os.environ, "DB_NAME": DB_NAME, "CACHE_SYNC": "true", "CACHE_SYNC_INTERVAL": "0.5"}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def wait_until_up(base):
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base}/").status_code == 200:
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Worker at {base} did not start")
+
+
+def converges(probe):
+    """Poll ``probe`` until it returns True or the deadline passes."""
+    deadline = time.time() + CONVERGE_SECONDS
+    while time.time() < deadline:
+        if probe():
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def drop_database():
+    from dotenv import dotenv_values
+    from pymongo import MongoClient
+
+    client = MongoClient(dotenv_values(BACKEND_DIR / ".env")["MONGO_URL"])
+    client.drop_database(DB_NAME)
+    client.close()
+
+
+def run_tests(writer, reader):
+    stay = {"check_in": "2030-01-01", "check_out": "2030-01-03", "room_type": "Penthouse"}
+    summary_range = {"start_date": "2030-01-01", "end_date": "2030-01-31"}
+
+    # Warm the reader's caches before writing through the other worker
+    available = requests.get(f"{reader}/rooms/availability", params=stay).json()
+    check("No Penthouse available before the write", available == [], str(available))
+    rooms_etag = requests.get(f"{reader}/rooms").headers.get("ETag")
+    expenses_before = requests.get(f"{reader}/financial-summary", params=summary_range).json()["total_expenses"]
+
+    print("\n1. Creating a room on worker A")
+    response = requests.post(f"{writer}/rooms", json={
+        "room_number": "9901", "room_type": "Penthouse", "price_per_night": 25000.0, "amenities": ["WiFi"]
+    })
+    check("Room created", response.status_code == 200, str(response.status_code))
+    check(
+        "Worker B offers the new room",
+        converges(lambda: [room["room_number"] for room in requests.get(f"{reader}/rooms/availability", params=stay).json()] == ["9901"])
+    )
+    check(
+        "Worker B no longer answers 304 for its old rooms ETag",
+        converges(lambda: requests.get(f"{reader}/rooms", headers={"If-None-Match": rooms_etag}).status_code == 200)
+    )
+
+    print("\n2. Booking the room on worker A")
+    response = requests.post(f"{writer}/bookings", json={
+        "guest_name": "Sync Test", "guest_email": "sync@example.com", "guest_phone": "555-0199",
+        "room_number": "9901", "check_in_date": "2030-01-01", "check_out_date": "2030-01-03", "booking_amount": 50000.0
+    })
+    check("Booking created", response.status_code == 200, str(response.status_code))
+    # Straight away, before worker B's index can have synced: the database decides
+    response = requests.post(f"{reader}/bookings", json={
+        "guest_name": "Overlap", "guest_email": "overlap@example.com", "guest_phone": "555-0198",
+        "room_number": "9901", "check_in_date": "2030-01-02", "check_out_date": "2030-01-04", "booking_amount": 50000.0
+    })
+    check("Worker B rejects an overlapping booking", response.status_code == 409, str(response.status_code))
+    check(
+        "Worker B shows the room as taken",
+        converges(lambda: requests.get(f"{reader}/rooms/availability", params=stay).json() == [])
+    )
+
+    print("\n3. Recording an expense on worker A")
+    response = requests.post(f"{writer}/expenses", json={
+        "description": "Sync test", "amount": 1234.0, "category": "Maintenance", "expense_date": "2030-01-05"
+    })
+    check("Expense created", response.status_code == 200, str(response.status_code))
+    check(
+        "Worker B's cached financial summary includes it",
+        converges(lambda: requests.get(f"{reader}/financial-summary", params=summary_range).json()["total_expenses"] == expenses_before + 1234.0)
+    )
+
+
+def main():
+    drop_database()
+    workers = [start_worker(port) for port in PORTS]
+    try:
+        writer, reader = (f"http://127.0.0.1:{port}/api" for port in PORTS)
+        for base in (writer, reader):
+            wait_until_up(base)
+        print(f"Testing cache sync between workers at {writer} and {reader}")
+        print("=" * 80)
+        run_tests(writer, reader)
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.wait()
+        drop_database()
+
+    return summary()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)